@@ -0,0 +1,42 @@
+"""harmonic person profile cache
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "harmonic_person_profile",
+        sa.Column("entity_urn", sa.Text(), primary_key=True),
+        sa.Column("profile", JSONB(), nullable=False),
+        sa.Column(
+            "fetched_at",
+            sa.DateTime(),
+            server_default=sa.text("timezone('utc', current_timestamp)"),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        "ix_harmonic_person_profile_fetched_at",
+        "harmonic_person_profile",
+        ["fetched_at"],
+    )
+
+
+def downgrade():
+    op.drop_index(
+        "ix_harmonic_person_profile_fetched_at", table_name="harmonic_person_profile"
+    )
+    op.drop_table("harmonic_person_profile")
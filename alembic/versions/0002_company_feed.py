@@ -0,0 +1,254 @@
+"""company feed
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+
+One row per source_company_id holding the sort keys of the /companies feed, so
+the feed no longer aggregates the whole company table on every request. Rows
+are refreshed by statement-level triggers, which also covers inserts made by
+the ingestion pipeline.
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "company_feed",
+        sa.Column("source_company_id", sa.Integer(), primary_key=True),
+        sa.Column("company_id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("name", sa.Text(), nullable=False),
+        sa.Column("is_hidden", sa.Boolean(), server_default=sa.false(), nullable=False),
+        sa.Column("company_metric_id", sa.Integer()),
+    )
+    op.create_index(
+        "ix_company_feed_visible_order",
+        "company_feed",
+        [sa.text("created_at DESC"), "name", sa.text("company_id DESC")],
+        postgresql_where=sa.text("is_hidden = false"),
+    )
+
+    # The refresh function looks companies and metrics up by these columns
+    op.create_index("ix_company_source_company_id", "company", ["source_company_id"])
+    op.create_index("ix_company_metric_company_id", "company_metric", ["company_id"])
+
+    op.execute(
+        """
+        CREATE FUNCTION company_feed_refresh(source_ids integer[]) RETURNS void
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            source_id integer;
+        BEGIN
+            -- Concurrent writers to the same source company would each recompute its
+            -- row without the other's uncommitted change, and the last to commit would
+            -- leave it stale. Take each key's lock until commit, in order so writers
+            -- can't deadlock; the statement below then starts with a snapshot showing
+            -- the committed work of whoever held it before.
+            FOR source_id IN
+                SELECT DISTINCT id FROM unnest(source_ids) id ORDER BY id
+            LOOP
+                PERFORM pg_advisory_xact_lock(hashtext('company_feed'), source_id);
+            END LOOP;
+
+            WITH grouped AS (
+                SELECT
+                    c.source_company_id,
+                    coalesce(
+                        max(c.id) FILTER (WHERE c.is_hidden IS NOT TRUE), max(c.id)
+                    ) AS company_id,
+                    coalesce(
+                        max(c.created_at) FILTER (WHERE c.is_hidden IS NOT TRUE),
+                        max(c.created_at)
+                    ) AS created_at,
+                    coalesce(
+                        max(c.name) FILTER (WHERE c.is_hidden IS NOT TRUE), max(c.name)
+                    ) AS name,
+                    bool_and(c.is_hidden IS TRUE) AS is_hidden
+                FROM company c
+                WHERE c.source_company_id = ANY(source_ids)
+                  AND c.source_company_id <> 0
+                  AND c.name IS NOT NULL
+                GROUP BY c.source_company_id
+            ),
+            upserted AS (
+                INSERT INTO company_feed AS f (
+                    source_company_id,
+                    company_id,
+                    created_at,
+                    name,
+                    is_hidden,
+                    company_metric_id
+                )
+                SELECT
+                    g.source_company_id,
+                    g.company_id,
+                    g.created_at,
+                    g.name,
+                    g.is_hidden,
+                    (
+                        SELECT max(m.id)
+                        FROM company_metric m
+                        WHERE m.company_id = g.company_id
+                    )
+                FROM grouped g
+                ON CONFLICT (source_company_id) DO UPDATE SET
+                    company_id = EXCLUDED.company_id,
+                    created_at = EXCLUDED.created_at,
+                    name = EXCLUDED.name,
+                    is_hidden = EXCLUDED.is_hidden,
+                    company_metric_id = EXCLUDED.company_metric_id
+                RETURNING f.source_company_id
+            )
+            DELETE FROM company_feed f
+            WHERE f.source_company_id = ANY(source_ids)
+              AND f.source_company_id NOT IN (SELECT source_company_id FROM upserted);
+        END;
+        $$;
+        """
+    )
+
+    op.execute(
+        """
+        CREATE FUNCTION company_feed_company_inserted() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            PERFORM company_feed_refresh(ARRAY(
+                SELECT DISTINCT source_company_id FROM new_rows
+                WHERE source_company_id IS NOT NULL
+            ));
+            RETURN NULL;
+        END;
+        $$;
+
+        CREATE FUNCTION company_feed_company_updated() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            -- Comment and relevance edits don't touch the feed, skip them
+            PERFORM company_feed_refresh(ARRAY(
+                SELECT source_company_id FROM (
+                    SELECT o.source_company_id AS old_id, n.source_company_id AS new_id
+                    FROM old_rows o JOIN new_rows n ON n.id = o.id
+                    WHERE (o.source_company_id, o.name, o.created_at, o.is_hidden)
+                        IS DISTINCT FROM
+                        (n.source_company_id, n.name, n.created_at, n.is_hidden)
+                ) changed,
+                LATERAL (VALUES (changed.old_id), (changed.new_id)) ids(source_company_id)
+                WHERE source_company_id IS NOT NULL
+                GROUP BY source_company_id
+            ));
+            RETURN NULL;
+        END;
+        $$;
+
+        CREATE FUNCTION company_feed_company_deleted() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            PERFORM company_feed_refresh(ARRAY(
+                SELECT DISTINCT source_company_id FROM old_rows
+                WHERE source_company_id IS NOT NULL
+            ));
+            RETURN NULL;
+        END;
+        $$;
+
+        CREATE TRIGGER company_feed_company_inserted
+            AFTER INSERT ON company REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION company_feed_company_inserted();
+
+        CREATE TRIGGER company_feed_company_updated
+            AFTER UPDATE ON company REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION company_feed_company_updated();
+
+        CREATE TRIGGER company_feed_company_deleted
+            AFTER DELETE ON company REFERENCING OLD TABLE AS old_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION company_feed_company_deleted();
+        """
+    )
+
+    op.execute(
+        """
+        CREATE FUNCTION company_feed_metric_changed() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            PERFORM company_feed_refresh(ARRAY(
+                SELECT DISTINCT c.source_company_id
+                FROM company c
+                JOIN changed_metrics m ON m.company_id = c.id
+                WHERE c.source_company_id IS NOT NULL
+            ));
+            RETURN NULL;
+        END;
+        $$;
+
+        CREATE FUNCTION company_feed_metric_updated() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            -- Only a metric moving to another company changes the feed
+            PERFORM company_feed_refresh(ARRAY(
+                SELECT DISTINCT c.source_company_id
+                FROM old_rows o
+                JOIN new_rows n ON n.id = o.id
+                JOIN company c ON c.id IN (o.company_id, n.company_id)
+                WHERE o.company_id IS DISTINCT FROM n.company_id
+                  AND c.source_company_id IS NOT NULL
+            ));
+            RETURN NULL;
+        END;
+        $$;
+
+        CREATE TRIGGER company_feed_metric_inserted
+            AFTER INSERT ON company_metric REFERENCING NEW TABLE AS changed_metrics
+            FOR EACH STATEMENT EXECUTE FUNCTION company_feed_metric_changed();
+
+        CREATE TRIGGER company_feed_metric_updated
+            AFTER UPDATE ON company_metric
+            REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION company_feed_metric_updated();
+
+        CREATE TRIGGER company_feed_metric_deleted
+            AFTER DELETE ON company_metric REFERENCING OLD TABLE AS changed_metrics
+            FOR EACH STATEMENT EXECUTE FUNCTION company_feed_metric_changed();
+        """
+    )
+
+    # Backfill from the existing companies
+    op.execute(
+        """
+        SELECT company_feed_refresh(ARRAY(
+            SELECT DISTINCT source_company_id FROM company
+            WHERE source_company_id IS NOT NULL
+        ))
+        """
+    )
+
+
+def downgrade():
+    op.execute(
+        """
+        DROP TRIGGER company_feed_metric_deleted ON company_metric;
+        DROP TRIGGER company_feed_metric_updated ON company_metric;
+        DROP TRIGGER company_feed_metric_inserted ON company_metric;
+        DROP TRIGGER company_feed_company_deleted ON company;
+        DROP TRIGGER company_feed_company_updated ON company;
+        DROP TRIGGER company_feed_company_inserted ON company;
+        DROP FUNCTION company_feed_metric_updated();
+        DROP FUNCTION company_feed_metric_changed();
+        DROP FUNCTION company_feed_company_deleted();
+        DROP FUNCTION company_feed_company_updated();
+        DROP FUNCTION company_feed_company_inserted();
+        DROP FUNCTION company_feed_refresh(integer[]);
+        """
+    )
+    op.drop_index("ix_company_metric_company_id", table_name="company_metric")
+    op.drop_index("ix_company_source_company_id", table_name="company")
+    op.drop_index("ix_company_feed_visible_order", table_name="company_feed")
+    op.drop_table("company_feed")
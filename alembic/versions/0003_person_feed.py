@@ -0,0 +1,359 @@
+"""person feed
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+
+One row per source_person_id with the /people sort keys, source name and list
+memberships pre-joined. Rows are refreshed by triggers on person,
+list_entity_association, list, signal and source.
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "person_feed",
+        sa.Column("source_person_id", sa.Integer(), primary_key=True),
+        sa.Column("person_id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("sort_name", sa.Text(), nullable=False),
+        sa.Column("source_name", sa.Text()),
+        sa.Column("lists", sa.JSON()),
+        sa.Column("is_hidden", sa.Boolean(), server_default=sa.false(), nullable=False),
+    )
+    op.create_index(
+        "ix_person_feed_visible_order",
+        "person_feed",
+        [sa.text("created_at DESC"), "sort_name", sa.text("person_id DESC")],
+        postgresql_where=sa.text("is_hidden = false"),
+    )
+
+    # The refresh function looks people and their list memberships up by these columns
+    op.create_index("ix_person_source_person_id", "person", ["source_person_id"])
+    op.create_index("ix_person_signal_id", "person", ["signal_id"])
+    op.create_index(
+        "ix_list_entity_association_entity",
+        "list_entity_association",
+        ["entity_type", "entity_id"],
+    )
+
+    op.execute(
+        """
+        CREATE FUNCTION person_feed_refresh(source_ids integer[]) RETURNS void
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            source_id integer;
+        BEGIN
+            -- Serialize refreshes of a source person until commit, like
+            -- company_feed_refresh, so concurrent writers can't leave a stale row
+            FOR source_id IN
+                SELECT DISTINCT id FROM unnest(source_ids) id ORDER BY id
+            LOOP
+                PERFORM pg_advisory_xact_lock(hashtext('person_feed'), source_id);
+            END LOOP;
+
+            WITH grouped AS (
+                SELECT
+                    p.source_person_id,
+                    coalesce(
+                        max(p.id) FILTER (WHERE p.is_hidden IS NOT TRUE), max(p.id)
+                    ) AS person_id,
+                    bool_and(p.is_hidden IS TRUE) AS is_hidden
+                FROM person p
+                WHERE p.source_person_id = ANY(source_ids)
+                  AND p.source_person_id <> 0
+                GROUP BY p.source_person_id
+            ),
+            upserted AS (
+                INSERT INTO person_feed AS f (
+                    source_person_id,
+                    person_id,
+                    created_at,
+                    sort_name,
+                    source_name,
+                    lists,
+                    is_hidden
+                )
+                SELECT
+                    g.source_person_id,
+                    g.person_id,
+                    p.created_at,
+                    coalesce(p.first_name, ''),
+                    s.name,
+                    (
+                        SELECT json_agg(json_build_object('id', l.id, 'name', l.name))
+                        FROM list_entity_association a
+                        JOIN list l ON l.id = a.list_id
+                        WHERE a.entity_type = 'person' AND a.entity_id = g.person_id
+                    ),
+                    g.is_hidden
+                FROM grouped g
+                JOIN person p ON p.id = g.person_id
+                LEFT JOIN signal sg ON sg.id = p.signal_id
+                LEFT JOIN source s ON s.id = sg.source_id
+                ON CONFLICT (source_person_id) DO UPDATE SET
+                    person_id = EXCLUDED.person_id,
+                    created_at = EXCLUDED.created_at,
+                    sort_name = EXCLUDED.sort_name,
+                    source_name = EXCLUDED.source_name,
+                    lists = EXCLUDED.lists,
+                    is_hidden = EXCLUDED.is_hidden
+                RETURNING f.source_person_id
+            )
+            DELETE FROM person_feed f
+            WHERE f.source_person_id = ANY(source_ids)
+              AND f.source_person_id NOT IN (SELECT source_person_id FROM upserted);
+        END;
+        $$;
+
+        -- Refresh the feed rows of the people with the given person ids
+        CREATE FUNCTION person_feed_refresh_people(person_ids integer[]) RETURNS void
+        LANGUAGE sql AS $$
+            SELECT person_feed_refresh(ARRAY(
+                SELECT DISTINCT source_person_id FROM person
+                WHERE id = ANY(person_ids) AND source_person_id IS NOT NULL
+            ));
+        $$;
+        """
+    )
+
+    op.execute(
+        """
+        CREATE FUNCTION person_feed_person_inserted() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            PERFORM person_feed_refresh(ARRAY(
+                SELECT DISTINCT source_person_id FROM new_rows
+                WHERE source_person_id IS NOT NULL
+            ));
+            RETURN NULL;
+        END;
+        $$;
+
+        CREATE FUNCTION person_feed_person_updated() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            -- Comment and relevance edits don't touch the feed, skip them
+            PERFORM person_feed_refresh(ARRAY(
+                SELECT source_person_id FROM (
+                    SELECT o.source_person_id AS old_id, n.source_person_id AS new_id
+                    FROM old_rows o JOIN new_rows n ON n.id = o.id
+                    WHERE (
+                        o.source_person_id,
+                        o.is_hidden,
+                        o.created_at,
+                        o.first_name,
+                        o.signal_id
+                    ) IS DISTINCT FROM (
+                        n.source_person_id,
+                        n.is_hidden,
+                        n.created_at,
+                        n.first_name,
+                        n.signal_id
+                    )
+                ) changed,
+                LATERAL (VALUES (changed.old_id), (changed.new_id)) ids(source_person_id)
+                WHERE source_person_id IS NOT NULL
+                GROUP BY source_person_id
+            ));
+            RETURN NULL;
+        END;
+        $$;
+
+        CREATE FUNCTION person_feed_person_deleted() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            PERFORM person_feed_refresh(ARRAY(
+                SELECT DISTINCT source_person_id FROM old_rows
+                WHERE source_person_id IS NOT NULL
+            ));
+            RETURN NULL;
+        END;
+        $$;
+
+        CREATE TRIGGER person_feed_person_inserted
+            AFTER INSERT ON person REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION person_feed_person_inserted();
+
+        CREATE TRIGGER person_feed_person_updated
+            AFTER UPDATE ON person REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION person_feed_person_updated();
+
+        CREATE TRIGGER person_feed_person_deleted
+            AFTER DELETE ON person REFERENCING OLD TABLE AS old_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION person_feed_person_deleted();
+        """
+    )
+
+    op.execute(
+        """
+        CREATE FUNCTION person_feed_membership_changed() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            PERFORM person_feed_refresh_people(ARRAY(
+                SELECT entity_id FROM changed_associations
+                WHERE entity_type = 'person'
+            ));
+            RETURN NULL;
+        END;
+        $$;
+
+        CREATE FUNCTION person_feed_membership_updated() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            PERFORM person_feed_refresh_people(ARRAY(
+                SELECT entity_id FROM old_rows WHERE entity_type = 'person'
+                UNION
+                SELECT entity_id FROM new_rows WHERE entity_type = 'person'
+            ));
+            RETURN NULL;
+        END;
+        $$;
+
+        CREATE FUNCTION person_feed_list_renamed() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            PERFORM person_feed_refresh_people(ARRAY(
+                SELECT a.entity_id
+                FROM old_rows o
+                JOIN new_rows n ON n.id = o.id
+                JOIN list_entity_association a ON a.list_id = n.id
+                WHERE o.name IS DISTINCT FROM n.name AND a.entity_type = 'person'
+            ));
+            RETURN NULL;
+        END;
+        $$;
+
+        CREATE TRIGGER person_feed_membership_inserted
+            AFTER INSERT ON list_entity_association
+            REFERENCING NEW TABLE AS changed_associations
+            FOR EACH STATEMENT EXECUTE FUNCTION person_feed_membership_changed();
+
+        CREATE TRIGGER person_feed_membership_updated
+            AFTER UPDATE ON list_entity_association
+            REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION person_feed_membership_updated();
+
+        CREATE TRIGGER person_feed_membership_deleted
+            AFTER DELETE ON list_entity_association
+            REFERENCING OLD TABLE AS changed_associations
+            FOR EACH STATEMENT EXECUTE FUNCTION person_feed_membership_changed();
+
+        CREATE TRIGGER person_feed_list_renamed
+            AFTER UPDATE ON list REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION person_feed_list_renamed();
+        """
+    )
+
+    # source_name comes from the person's signal and its source
+    op.execute(
+        """
+        CREATE FUNCTION person_feed_signal_changed() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            PERFORM person_feed_refresh_people(ARRAY(
+                SELECT p.id FROM person p JOIN changed_signals s ON s.id = p.signal_id
+            ));
+            RETURN NULL;
+        END;
+        $$;
+
+        CREATE FUNCTION person_feed_signal_moved() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            PERFORM person_feed_refresh_people(ARRAY(
+                SELECT id FROM person WHERE signal_id = NEW.id
+            ));
+            RETURN NULL;
+        END;
+        $$;
+
+        CREATE FUNCTION person_feed_source_renamed() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            PERFORM person_feed_refresh_people(ARRAY(
+                SELECT p.id
+                FROM person p
+                JOIN signal sg ON sg.id = p.signal_id
+                WHERE sg.source_id = NEW.id
+            ));
+            RETURN NULL;
+        END;
+        $$;
+
+        CREATE TRIGGER person_feed_signal_inserted
+            AFTER INSERT ON signal REFERENCING NEW TABLE AS changed_signals
+            FOR EACH STATEMENT EXECUTE FUNCTION person_feed_signal_changed();
+
+        CREATE TRIGGER person_feed_signal_deleted
+            AFTER DELETE ON signal REFERENCING OLD TABLE AS changed_signals
+            FOR EACH STATEMENT EXECUTE FUNCTION person_feed_signal_changed();
+
+        -- Row triggers, since transition tables can't be limited to a column: other
+        -- updates of signal, the largest table, skip them without calling anything
+        CREATE TRIGGER person_feed_signal_moved
+            AFTER UPDATE OF source_id ON signal
+            FOR EACH ROW WHEN (OLD.source_id IS DISTINCT FROM NEW.source_id)
+            EXECUTE FUNCTION person_feed_signal_moved();
+
+        CREATE TRIGGER person_feed_source_renamed
+            AFTER UPDATE OF name ON source
+            FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+            EXECUTE FUNCTION person_feed_source_renamed();
+        """
+    )
+
+    # Backfill from the existing people
+    op.execute(
+        """
+        SELECT person_feed_refresh(ARRAY(
+            SELECT DISTINCT source_person_id FROM person
+            WHERE source_person_id IS NOT NULL
+        ))
+        """
+    )
+
+
+def downgrade():
+    op.execute(
+        """
+        DROP TRIGGER person_feed_source_renamed ON source;
+        DROP TRIGGER person_feed_signal_moved ON signal;
+        DROP TRIGGER person_feed_signal_deleted ON signal;
+        DROP TRIGGER person_feed_signal_inserted ON signal;
+        DROP TRIGGER person_feed_list_renamed ON list;
+        DROP TRIGGER person_feed_membership_deleted ON list_entity_association;
+        DROP TRIGGER person_feed_membership_updated ON list_entity_association;
+        DROP TRIGGER person_feed_membership_inserted ON list_entity_association;
+        DROP TRIGGER person_feed_person_deleted ON person;
+        DROP TRIGGER person_feed_person_updated ON person;
+        DROP TRIGGER person_feed_person_inserted ON person;
+        DROP FUNCTION person_feed_source_renamed();
+        DROP FUNCTION person_feed_signal_moved();
+        DROP FUNCTION person_feed_signal_changed();
+        DROP FUNCTION person_feed_list_renamed();
+        DROP FUNCTION person_feed_membership_updated();
+        DROP FUNCTION person_feed_membership_changed();
+        DROP FUNCTION person_feed_person_deleted();
+        DROP FUNCTION person_feed_person_updated();
+        DROP FUNCTION person_feed_person_inserted();
+        DROP FUNCTION person_feed_refresh_people(integer[]);
+        DROP FUNCTION person_feed_refresh(integer[]);
+        """
+    )
+    op.drop_index(
+        "ix_list_entity_association_entity", table_name="list_entity_association"
+    )
+    op.drop_index("ix_person_signal_id", table_name="person")
+    op.drop_index("ix_person_source_person_id", table_name="person")
+    op.drop_index("ix_person_feed_visible_order", table_name="person_feed")
+    op.drop_table("person_feed")
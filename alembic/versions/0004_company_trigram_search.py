@@ -0,0 +1,51 @@
+"""company trigram search
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+
+"""
+
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Normalized name + legal name + aliases document used by fuzzy company search.
+    # array_to_string is only STABLE, so wrap it to make the document indexable.
+    op.execute(
+        """
+        CREATE FUNCTION company_search_document(name text, legal_name text, aliases text[])
+        RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+            SELECT lower(concat_ws(' ', name, legal_name, array_to_string(aliases, ' ')))
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE INDEX ix_company_search_document_trgm ON company
+        USING gin (company_search_document(name, legal_name, name_aliases) gin_trgm_ops)
+        """
+    )
+
+    # Prefix lookups for the typeahead endpoint
+    op.execute(
+        """
+        CREATE INDEX ix_company_feed_name_prefix ON company_feed
+        (lower(name) text_pattern_ops)
+        WHERE is_hidden = false
+        """
+    )
+
+
+def downgrade():
+    op.execute("DROP INDEX ix_company_feed_name_prefix")
+    op.execute("DROP INDEX ix_company_search_document_trgm")
+    op.execute("DROP FUNCTION company_search_document(text, text, text[])")
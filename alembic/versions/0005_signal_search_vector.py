@@ -0,0 +1,121 @@
+"""signal full-text search
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+
+Stored tsvector over the signal name, the newsletter title and body in
+source_data, and the entity names found by NER, backing /signals/search.
+
+signal is the largest table, so nothing here rewrites or locks it for long: the
+column is added empty and kept up to date by a trigger, existing rows are filled
+in committed batches and the index is built concurrently.
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+
+def upgrade():
+    # Title and name weigh most, then the NER entities, then the body
+    op.execute(
+        """
+        CREATE FUNCTION signal_search_vector(name text, source_data json, ner_tags json)
+        RETURNS tsvector
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+            SELECT
+                setweight(to_tsvector('english', coalesce(name, '')), 'A')
+                || setweight(
+                    to_tsvector('english', coalesce(source_data ->> 'doc_title', '')), 'A'
+                )
+                || setweight(to_tsvector('english', coalesce((
+                    SELECT string_agg(entity, ' ')
+                    FROM json_each(
+                        CASE WHEN json_typeof(ner_tags) = 'object' THEN ner_tags END
+                    ) AS tags(kind, entities),
+                    LATERAL json_object_keys(
+                        CASE WHEN json_typeof(entities) = 'object' THEN entities END
+                    ) AS entity
+                ), '')), 'B')
+                || setweight(
+                    to_tsvector('english', coalesce(source_data ->> 'body', '')), 'C'
+                )
+        $$
+        """
+    )
+    # Nullable without a default, so adding it only changes the catalog
+    op.add_column(
+        "signal", sa.Column("search_vector", postgresql.TSVECTOR(), nullable=True)
+    )
+    op.execute(
+        """
+        CREATE FUNCTION signal_search_vector_refresh() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            NEW.search_vector := signal_search_vector(
+                NEW.name, NEW.source_data, NEW.ner_tags
+            );
+            RETURN NEW;
+        END;
+        $$;
+
+        CREATE TRIGGER signal_search_vector_refresh
+            BEFORE INSERT OR UPDATE OF name, source_data, ner_tags ON signal
+            FOR EACH ROW EXECUTE FUNCTION signal_search_vector_refresh();
+        """
+    )
+
+    # Rows written from here on are covered by the trigger. Fill in the others one
+    # id range per transaction, so no batch holds its row locks for long.
+    with op.get_context().autocommit_block():
+        op.execute(
+            f"""
+            DO $$
+            DECLARE
+                batch_start integer := 0;
+                last_id integer := (SELECT max(id) FROM signal);
+            BEGIN
+                WHILE batch_start < last_id LOOP
+                    UPDATE signal
+                    SET search_vector = signal_search_vector(
+                        name, source_data, ner_tags
+                    )
+                    WHERE id > batch_start
+                      AND id <= batch_start + {BACKFILL_BATCH_SIZE}
+                      AND search_vector IS NULL;
+                    COMMIT;
+                    batch_start := batch_start + {BACKFILL_BATCH_SIZE};
+                END LOOP;
+            END;
+            $$
+            """
+        )
+        op.create_index(
+            "ix_signal_search_vector",
+            "signal",
+            ["search_vector"],
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_signal_search_vector",
+            table_name="signal",
+            postgresql_concurrently=True,
+        )
+    op.execute("DROP TRIGGER signal_search_vector_refresh ON signal")
+    op.execute("DROP FUNCTION signal_search_vector_refresh()")
+    op.drop_column("signal", "search_vector")
+    op.execute("DROP FUNCTION signal_search_vector(text, json, json)")
@@ -0,0 +1,40 @@
+"""hot query indexes
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+
+Indexes for the access paths of the list, detail and list-membership queries
+that the earlier revisions did not already add. tests/test_query_plans.py checks
+that the hot queries keep using them.
+
+"""
+
+from alembic import op
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Signal provenance of a company, and the same-name aggregates of the detail page
+    op.create_index("ix_company_signal_id", "company", ["signal_id"])
+    op.create_index("ix_company_name", "company", ["name"])
+
+    # Membership lookups and joins of a list (/companies and /people ?list_id=,
+    # /lists/{id}/entities and the add/remove endpoints)
+    op.create_index(
+        "ix_list_entity_association_list",
+        "list_entity_association",
+        ["list_id", "entity_type", "entity_id"],
+    )
+
+
+def downgrade():
+    op.drop_index(
+        "ix_list_entity_association_list", table_name="list_entity_association"
+    )
+    op.drop_index("ix_company_name", table_name="company")
+    op.drop_index("ix_company_signal_id", table_name="company")
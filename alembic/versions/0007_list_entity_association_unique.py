@@ -0,0 +1,51 @@
+"""list entity association unique
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+
+A list holds an entity at most once. Concurrent adds used to be able to insert the
+same membership twice, so drop those duplicates, keeping the earliest, before
+adding the constraint. Its index replaces ix_list_entity_association_list, which
+covered the same columns.
+
+"""
+
+from alembic import op
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        """
+        DELETE FROM list_entity_association duplicate
+        USING list_entity_association earliest
+        WHERE duplicate.list_id = earliest.list_id
+          AND duplicate.entity_type = earliest.entity_type
+          AND duplicate.entity_id = earliest.entity_id
+          AND (earliest.created_at, earliest.id) < (duplicate.created_at, duplicate.id)
+        """
+    )
+    op.create_unique_constraint(
+        "uq_list_entity_association",
+        "list_entity_association",
+        ["list_id", "entity_type", "entity_id"],
+    )
+    op.drop_index(
+        "ix_list_entity_association_list", table_name="list_entity_association"
+    )
+
+
+def downgrade():
+    op.create_index(
+        "ix_list_entity_association_list",
+        "list_entity_association",
+        ["list_id", "entity_type", "entity_id"],
+    )
+    op.drop_constraint(
+        "uq_list_entity_association", "list_entity_association", type_="unique"
+    )
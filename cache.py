@@ -0,0 +1,161 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional, Set
+
+# Every cache registers itself here so its counters can be inspected at /metrics/cache
+CACHES: Dict[str, "TTLCache"] = {}
+
+
+class TTLCache:
+    """Thread-safe in-process LRU cache whose entries also expire after `ttl` seconds."""
+
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        CACHES[name] = self
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self._removed(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+
+            self._evict()
+
+    def _evict(self) -> None:
+        while len(self._data) > self.maxsize:
+            key, _ = self._data.popitem(last=False)
+            self._removed(key)
+            self.evictions += 1
+
+    def _removed(self, key: Hashable) -> None:
+        """Called with the lock held whenever an entry leaves the cache."""
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            if self._data.pop(key, None) is not None:
+                self._removed(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._data):
+                self._removed(key)
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class TaggedCache(TTLCache):
+    """
+    TTLCache whose entries carry tags, so a write can drop exactly the entries it
+    affects with `invalidate`.
+
+    Readers take `version` before computing a value and pass it back to `set`; if an
+    invalidation ran in between, the possibly stale value is not stored.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        super().__init__(name, maxsize, ttl)
+        self.version = 0
+        self.invalidations = 0
+        self._tags: Dict[str, Set[Hashable]] = {}
+        self._entry_tags: Dict[Hashable, Set[str]] = {}
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        tags: Iterable[str] = (),
+        ttl: Optional[float] = None,
+        version: Optional[int] = None,
+    ) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+
+        with self._lock:
+            if version is not None and version != self.version:
+                return
+
+            if key in self._data:
+                self._removed(key)
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+
+            tags = set(tags)
+            self._entry_tags[key] = tags
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+
+            self._evict()
+
+    def _removed(self, key: Hashable) -> None:
+        for tag in self._entry_tags.pop(key, ()):
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def invalidate(self, *tags: str) -> int:
+        """Drop every entry carrying any of `tags` and return how many were dropped."""
+        with self._lock:
+            self.version += 1
+
+            keys = set()
+            for tag in tags:
+                keys |= self._tags.get(tag, set())
+
+            for key in keys:
+                self._data.pop(key, None)
+                self._removed(key)
+
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        with self._lock:
+            stats["invalidations"] = self.invalidations
+            stats["tags"] = len(self._tags)
+        return stats
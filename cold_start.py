@@ -0,0 +1,99 @@
+"""
+Cold start report for the Lambda handler.
+
+Imports `main` the way a fresh Lambda container does (lazy routers), then reports
+the slowest imports, the time to load each group of routes on its first request
+and the time to generate the OpenAPI schema. Exits non-zero if importing `main`
+takes longer than `--max-ms`, so cold start regressions can fail a build:
+
+    poetry run python cold_start.py --max-ms 800
+
+`--openapi PATH` also writes the generated schema, to be served from
+OPENAPI_SCHEMA_PATH instead of importing every route module for /docs.
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+IMPORT_TIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)")
+
+
+def profile_imports(module: str):
+    """(module, cumulative ms) for every import made by `module`, in a fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env={**os.environ, "LAZY_ROUTERS": "true"},
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr)
+
+    imports = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            depth = (len(match.group(3)) - 1) // 2
+            imports.append((match.group(4), int(match.group(2)) / 1000, depth))
+
+    # Each module is printed after its own imports, so those made by `module` are
+    # the ones between it and the previous top-level line
+    end = next(i for i, (name, _, depth) in enumerate(imports) if name == module)
+    start = max(
+        (i + 1 for i, (_, _, depth) in enumerate(imports[:end]) if depth == 0),
+        default=0,
+    )
+    direct = [(name, ms) for name, ms, depth in imports[start:end] if depth == 1]
+    return imports[end][1], sorted(direct, key=lambda item: item[1], reverse=True)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--max-ms", type=float)
+    parser.add_argument("--openapi", metavar="PATH")
+    args = parser.parse_args()
+
+    import_ms, slowest = profile_imports("main")
+    print(f"import main: {import_ms:.1f} ms")
+    for name, ms in slowest[: args.top]:
+        print(f"  {ms:8.1f} ms  {name}")
+
+    # In process from here on, for the work deferred to the first requests
+    os.environ["LAZY_ROUTERS"] = "true"
+    import main as app_module
+
+    routers = app_module.routers
+    print("first request per route group:")
+    for segment, module_names in app_module.ROUTER_GROUPS.items():
+        if all(name in routers.load_times for name in module_names):
+            continue
+        started_at = time.perf_counter()
+        routers.load_path(f"/{segment}")
+        print(
+            f"  {(time.perf_counter() - started_at) * 1000:8.1f} ms  /{segment}"
+            f" ({len(module_names)} modules)"
+        )
+
+    started_at = time.perf_counter()
+    schema = app_module.app.openapi()
+    print(f"openapi schema: {(time.perf_counter() - started_at) * 1000:.1f} ms")
+
+    if args.openapi:
+        with open(args.openapi, "w") as schema_file:
+            json.dump(schema, schema_file)
+        print(f"wrote {args.openapi}")
+
+    if args.max_ms is not None and import_ms > args.max_ms:
+        print(f"FAIL import main took {import_ms:.1f} ms, over {args.max_ms} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
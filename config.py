@@ -1,4 +1,5 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Literal, Optional
 import os
 
 IS_LAMBDA = os.environ.get("AWS_LAMBDA_FUNCTION_NAME") is not None
@@ -11,9 +12,64 @@ class Settings(BaseSettings):
     database_name: str
     database_username: str
 
+    # Connection pool profile: "server", "lambda" or "lambda_proxy" (behind RDS
+    # Proxy). Defaults to "lambda" when running in Lambda and "server" otherwise.
+    # In the lambda profile each engine keeps one connection warm across invocations,
+    # and lambda_proxy opens one per checkout. The sizes below apply to the server
+    # profile. The async engine serves the feeds, detail pages and writes. The sync
+    # engine serves the remaining threadpool handlers and the Harmonic person cache
+    # lookups of the detail, batch and export paths; all of them run on anyio's
+    # default threadpool of 40 threads, so its 10 + 30 connections let every thread
+    # hold one rather than queue for db_pool_timeout. Streamed exports keep theirs for
+    # the whole download, also between threadpool hops, so a burst of exports can
+    # still exhaust it. The 30 overflow connections are closed on return. A worker
+    # opens at most the sum of all four, 55 by default, so size them against the
+    # server's max_connections divided by the number of workers.
+    db_pool_profile: Optional[Literal["server", "lambda", "lambda_proxy"]] = None
+    db_pool_size: int = 10
+    db_max_overflow: int = 5
+    db_sync_pool_size: int = 10
+    db_sync_max_overflow: int = 30
+    db_pool_timeout: float = 10.0
+    db_pool_recycle: int = 30 * 60
+
     api_key: str
 
+    # Import route modules on the first request under their path prefix rather than
+    # at startup. Defaults to on in Lambda, where it shortens cold starts.
+    lazy_routers: Optional[bool] = None
+    # Pre-generated schema (`python cold_start.py --openapi PATH`) served at
+    # /openapi.json, so the docs don't have to import every route module
+    openapi_schema_path: Optional[str] = None
+
     harmonic_api_key: str
+    harmonic_api_url: str = "https://api.harmonic.ai/graphql"
+    harmonic_connect_timeout: float = 3.05
+    harmonic_read_timeout: float = 10.0
+    harmonic_pool_size: int = 10
+    harmonic_request_deadline: float = 8.0
+    harmonic_etag_window: int = 15 * 60
+
+    harmonic_person_cache_size: int = 5000
+    harmonic_person_cache_memory_ttl: int = 60 * 60
+    harmonic_person_cache_ttl: int = 7 * 24 * 60 * 60
+
+    # Pages of /companies and /people, dropped by the write endpoints. The TTL bounds
+    # staleness for other processes and for rows written by the ingestion pipeline.
+    feed_cache_size: int = 512
+    feed_cache_ttl: int = 60
+
+    # Validate responses built from our own rows a second time before sending them,
+    # as FastAPI does by default. For tests; it costs CPU on every large response.
+    strict_response_validation: bool = False
+
+    # Report the SQL statements run for each request in an X-Query-Count header. For
+    # development; the middleware costs every request a little.
+    debug_query_count: bool = False
+
+    # Rows fetched from the server-side cursor, and resolved against Harmonic, per
+    # chunk of a streamed export
+    export_chunk_size: int = 500
 
     class Config:
         env_file = ".env"
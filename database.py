@@ -1,17 +1,76 @@
-from sqlalchemy import create_engine
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from config import settings
+from config import IS_LAMBDA, settings
+from db_pool import default_pool_profile, pool_options
 
 SQLALCHEMY_DATABASE_URL = f"postgresql://{settings.database_username}:{settings.database_password}@{settings.database_hostname}:{settings.database_port}/{settings.database_name}"
+ASYNC_SQLALCHEMY_DATABASE_URL = SQLALCHEMY_DATABASE_URL.replace(
+    "postgresql://", "postgresql+asyncpg://", 1
+)
+
 
+POOL_PROFILE = default_pool_profile(IS_LAMBDA, settings.db_pool_profile)
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+# Each engine's pool is sized for its own share of the requests, see config.py. In
+# Lambda both keep one warm connection: Mangum reuses its event loop across warm
+# invocations, so asyncpg connections outlive the request that opened them.
+SYNC_POOL_OPTIONS = pool_options(
+    POOL_PROFILE,
+    is_async=False,
+    pool_size=settings.db_sync_pool_size,
+    max_overflow=settings.db_sync_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_recycle=settings.db_pool_recycle,
+)
+ASYNC_POOL_OPTIONS = pool_options(
+    POOL_PROFILE,
+    is_async=True,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_recycle=settings.db_pool_recycle,
+)
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **SYNC_POOL_OPTIONS)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = create_async_engine(ASYNC_SQLALCHEMY_DATABASE_URL, **ASYNC_POOL_OPTIONS)
+
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
+
 Base = declarative_base()
 
+QUERY_COUNT_HEADER = "X-Query-Count"
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+
+# Statements executed on behalf of the current request, set by the middleware in
+# main.py when DEBUG_QUERY_COUNT is on, and by tests/test_query_counts.py. Worker
+# threads inherit a copy of the context, so the counter object is shared with them.
+query_counter: ContextVar[Optional[QueryCounter]] = ContextVar(
+    "query_counter", default=None
+)
+
+
+@event.listens_for(engine, "before_cursor_execute")
+@event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+def count_query(conn, cursor, statement, parameters, context, executemany):
+    counter = query_counter.get()
+    if counter is not None:
+        counter.count += 1
+
 
 def get_db():
     db = SessionLocal()
@@ -19,3 +78,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
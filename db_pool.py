@@ -0,0 +1,158 @@
+import threading
+import time
+from typing import Literal, Optional
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool
+
+PoolProfile = Literal["server", "lambda", "lambda_proxy"]
+
+
+class PoolMetrics:
+    """Checkout wait times and saturation of one connection pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.peak_checked_out = 0
+
+    def record_checkout(self, wait_seconds: float, checked_out: int) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_total += wait_seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, wait_seconds)
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+
+    def record_timeout(self, wait_seconds: float) -> None:
+        with self._lock:
+            self.timeouts += 1
+            self.wait_seconds_total += wait_seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, wait_seconds)
+
+    def stats(self) -> dict:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_ms_avg": (
+                    round(self.wait_seconds_total / attempts * 1000, 3)
+                    if attempts
+                    else 0.0
+                ),
+                "wait_ms_max": round(self.wait_seconds_max * 1000, 3),
+                "peak_checked_out": self.peak_checked_out,
+            }
+
+
+class _TimedPool:
+    """Records how long each checkout waits for a connection in `self.metrics`."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record_timeout(time.perf_counter() - started_at)
+            raise
+
+        self.metrics.record_checkout(
+            time.perf_counter() - started_at,
+            self.checkedout() if isinstance(self, QueuePool) else 0,
+        )
+        return connection
+
+    def recreate(self):
+        # engine.dispose() swaps in a new pool; keep counting into the same metrics
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class TimedQueuePool(_TimedPool, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_TimedPool, AsyncAdaptedQueuePool):
+    pass
+
+
+class TimedNullPool(_TimedPool, NullPool):
+    pass
+
+
+def default_pool_profile(is_lambda: bool, profile: Optional[str]) -> PoolProfile:
+    if profile:
+        return profile
+    return "lambda" if is_lambda else "server"
+
+
+def pool_options(
+    profile: PoolProfile,
+    *,
+    is_async: bool,
+    pool_size: int,
+    max_overflow: int,
+    pool_timeout: float,
+    pool_recycle: int,
+) -> dict:
+    """
+    create_engine() pool arguments for a deployment profile:
+
+    - server: a long-lived process; keep `pool_size` connections and allow
+      `max_overflow` more under bursts, checked with a ping before use and replaced
+      after `pool_recycle` seconds so dropped or stale connections are never handed out.
+    - lambda: one request at a time per container, so keep a single connection
+      warm between invocations. One overflow connection covers code that opens a
+      second session while the first is in use, and is closed on return. This holds
+      for asyncpg too: Mangum runs every warm invocation on the same event loop.
+    - lambda_proxy: behind RDS Proxy, which does the pooling; open a connection per
+      checkout and close it straight after.
+    """
+    if profile == "lambda_proxy":
+        return {"poolclass": TimedNullPool}
+
+    if profile == "lambda":
+        pool_size, max_overflow = 1, 1
+
+    return {
+        "poolclass": TimedAsyncAdaptedQueuePool if is_async else TimedQueuePool,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": pool_timeout,
+        "pool_recycle": pool_recycle,
+        "pool_pre_ping": True,
+    }
+
+
+def pool_stats(pool: Pool, profile: PoolProfile, options: dict) -> dict:
+    """Stats of `pool`, created from the pool_options() `options`."""
+    stats = {"profile": profile, "pool": type(pool).__name__}
+
+    if isinstance(pool, QueuePool):
+        max_overflow = options["max_overflow"]
+        capacity = pool.size() + max_overflow
+        checked_out = pool.checkedout()
+        stats.update(
+            {
+                "size": pool.size(),
+                "max_overflow": max_overflow,
+                "checked_out": checked_out,
+                "checked_in": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "saturation": round(checked_out / capacity, 3) if capacity else 0.0,
+            }
+        )
+
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        stats.update(metrics.stats())
+    return stats
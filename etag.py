@@ -0,0 +1,48 @@
+import hashlib
+import json
+from typing import Optional
+
+from fastapi import Request, Response, status
+from sqlalchemy import Text, cast, literal_column
+from sqlalchemy.orm import Session
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag over `parts`, which must change whenever the representation does."""
+    payload = json.dumps(parts, default=str, separators=(",", ":"))
+    return f'"{hashlib.sha1(payload.encode()).hexdigest()}"'
+
+
+def row_version(model):
+    """
+    Columns identifying the current version of a `model` row: its updated_at, and
+    the row's xmin, which Postgres changes on every update, including those made
+    outside the ORM that leave updated_at alone.
+    """
+    return (
+        model.id,
+        model.updated_at,
+        cast(literal_column(f"{model.__tablename__}.xmin"), Text),
+    )
+
+
+def get_row_version(db: Session, model, entity_id: int) -> Optional[tuple]:
+    row = db.query(*row_version(model)).filter(model.id == entity_id).one_or_none()
+    return tuple(row) if row else None
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+
+    # If-None-Match uses the weak comparison, so ignore W/ prefixes
+    return any(
+        candidate.strip().removeprefix("W/") == etag for candidate in header.split(",")
+    )
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
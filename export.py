@@ -0,0 +1,66 @@
+import csv
+import io
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def chunked(rows: Iterable, size: int) -> Iterator[List]:
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+def joined(values: Iterable) -> str:
+    return "; ".join(str(value) for value in values if value)
+
+
+def _ndjson_lines(chunks: Iterator[List[BaseModel]]) -> Iterator[str]:
+    for chunk in chunks:
+        yield "".join(item.model_dump_json() + "\n" for item in chunk)
+
+
+def _csv_lines(
+    chunks: Iterator[List[BaseModel]], columns: Dict[str, Callable[[Any], Any]]
+) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(columns)
+    for chunk in chunks:
+        writer.writerows(
+            [[column(item) for column in columns.values()] for item in chunk]
+        )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    yield buffer.getvalue()
+
+
+def export_response(
+    chunks: Iterator[List[BaseModel]],
+    file_format: str,
+    filename: str,
+    csv_columns: Dict[str, Callable[[Any], Any]],
+) -> StreamingResponse:
+    """
+    Stream `chunks` of response models as NDJSON (full rows) or CSV (`csv_columns`,
+    a header to value mapping), one write per chunk.
+    """
+    lines = (
+        _csv_lines(chunks, csv_columns)
+        if file_format == "csv"
+        else _ndjson_lines(chunks)
+    )
+    return StreamingResponse(
+        lines,
+        media_type=MEDIA_TYPES[file_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}.{file_format}"'
+        },
+    )
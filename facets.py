@@ -0,0 +1,125 @@
+from datetime import date
+from typing import List, Optional
+
+from pydantic import BaseModel
+from sqlalchemy import and_, distinct, func, tuple_
+from sqlalchemy.orm import Query, aliased
+
+from models import List as DBList, ListEntityAssociation
+
+
+class FacetCount(BaseModel):
+    value: Optional[str]
+    count: int
+
+
+class DayFacetCount(BaseModel):
+    value: date
+    count: int
+
+
+class ListFacetCount(BaseModel):
+    id: int
+    name: str
+    count: int
+
+
+class FacetsResponse(BaseModel):
+    total: int
+    source_name: List[FacetCount]
+    created_at: List[DayFacetCount]
+    relevence_stage: List[FacetCount]
+    lists: List[ListFacetCount]
+
+
+# GROUPING(source_name, created_at, relevence_stage, list_id) of the rows of each
+# grouping set: a bit is set for every facet column the row is not grouped by
+SOURCE_NAME_SET = 0b0111
+CREATED_AT_SET = 0b1011
+RELEVENCE_STAGE_SET = 0b1101
+LIST_SET = 0b1110
+TOTAL_SET = 0b1111
+
+
+def facets_query(
+    query: Query,
+    entity_type: str,
+    entity_id,
+    feed_key,
+    source_name,
+    created_at,
+    relevence_stage,
+) -> Query:
+    """
+    Turn an unpaged feed `query` into a single GROUPING SETS aggregate with the
+    total and the number of feed rows per source, creation day, relevance stage and
+    list. Joining the list memberships repeats an entity once per list, so every set
+    counts distinct `feed_key` values.
+    """
+    membership = aliased(ListEntityAssociation)
+    day = func.date(created_at)
+
+    return (
+        query.order_by(None)
+        .outerjoin(
+            membership,
+            and_(
+                membership.entity_id == entity_id,
+                membership.entity_type == entity_type,
+            ),
+        )
+        .outerjoin(DBList, DBList.id == membership.list_id)
+        .with_entities(
+            func.grouping(source_name, day, relevence_stage, DBList.id).label(
+                "grouping"
+            ),
+            source_name.label("source_name"),
+            day.label("created_at"),
+            relevence_stage.label("relevence_stage"),
+            DBList.id.label("list_id"),
+            DBList.name.label("list_name"),
+            func.count(distinct(feed_key)).label("count"),
+        )
+        .group_by(
+            func.grouping_sets(
+                tuple_(),
+                source_name,
+                day,
+                relevence_stage,
+                tuple_(DBList.id, DBList.name),
+            )
+        )
+    )
+
+
+def parse_facets(rows) -> dict:
+    facets = {
+        "total": 0,
+        "source_name": [],
+        "created_at": [],
+        "relevence_stage": [],
+        "lists": [],
+    }
+    for row in rows:
+        if row.grouping == TOTAL_SET:
+            facets["total"] = row.count
+        elif row.grouping == SOURCE_NAME_SET:
+            facets["source_name"].append({"value": row.source_name, "count": row.count})
+        elif row.grouping == CREATED_AT_SET:
+            facets["created_at"].append({"value": row.created_at, "count": row.count})
+        elif row.grouping == RELEVENCE_STAGE_SET:
+            facets["relevence_stage"].append(
+                {"value": row.relevence_stage, "count": row.count}
+            )
+        # Entities in no list form a group of their own, which is not a list facet
+        elif row.grouping == LIST_SET and row.list_id is not None:
+            facets["lists"].append(
+                {"id": row.list_id, "name": row.list_name, "count": row.count}
+            )
+
+    # Largest groups first, newest days first
+    for name in ("source_name", "relevence_stage"):
+        facets[name].sort(key=lambda facet: (-facet["count"], facet["value"] or ""))
+    facets["created_at"].sort(key=lambda facet: facet["value"], reverse=True)
+    facets["lists"].sort(key=lambda facet: (-facet["count"], facet["name"]))
+    return facets
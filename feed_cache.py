@@ -0,0 +1,48 @@
+from datetime import date
+from typing import Hashable, Optional
+
+from cache import TaggedCache
+from config import settings
+
+# Tags of cached /companies and /people pages. A page carries its feed tag, a tag per
+# source entity on it and, when filtered by list, the list tag.
+COMPANIES_FEED = "companies"
+PEOPLE_FEED = "people"
+
+# Tags of cached facet counts, which also carry their feed tag. Relevance and list
+# membership changes move entities between facets, so they drop these as well.
+COMPANY_FACETS = "companies:facets"
+PEOPLE_FACETS = "people:facets"
+
+feed_cache = TaggedCache(
+    "feed_responses",
+    maxsize=settings.feed_cache_size,
+    ttl=settings.feed_cache_ttl,
+)
+
+
+def company_tag(source_company_id: Optional[int]) -> str:
+    return f"company:{source_company_id}"
+
+
+def person_tag(source_person_id: Optional[int]) -> str:
+    return f"person:{source_person_id}"
+
+
+def list_tag(list_id: int) -> str:
+    return f"list:{list_id}"
+
+
+def _normalize(value):
+    if value == "":
+        return None
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def feed_cache_key(feed: str, **filters) -> Hashable:
+    """Cache key of a feed page, equal for requests that run the same query."""
+    return (feed,) + tuple(
+        (name, _normalize(value)) for name, value in sorted(filters.items())
+    )
@@ -0,0 +1,203 @@
+import asyncio
+import logging
+import threading
+from functools import lru_cache, partial
+from typing import Awaitable, List, Optional, Sequence
+
+import anyio
+import requests
+from fastapi import HTTPException, status
+from requests.adapters import HTTPAdapter
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Person fields needed by the /companies list cards
+PERSON_CARD_FIELDS = ("fullName", "entityUrn")
+
+# Person fields needed by the /companies/{company_id} detail page
+PERSON_DETAIL_FIELDS = ("fullName", "profilePictureUrl", "entityUrn", "socials")
+
+# GraphQL selections for person fields that are not plain scalars
+PERSON_FIELD_SELECTIONS = {
+    "socials": "socials { linkedin { url } }",
+}
+
+
+class HarmonicClient:
+    """Pooled, keep-alive client for the Harmonic GraphQL API."""
+
+    def __init__(
+        self,
+        url: str,
+        api_key: str,
+        connect_timeout: float,
+        read_timeout: float,
+        pool_size: int,
+    ):
+        self.url = url
+        self.timeout = (connect_timeout, read_timeout)
+        self.session = requests.Session()
+        self.session.headers.update(
+            {"Content-Type": "application/json", "apikey": api_key}
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def execute(self, query: str, variables: Optional[dict] = None):
+        payload = {"query": query}
+        if variables:
+            payload["variables"] = variables
+
+        try:
+            response = self.session.post(self.url, json=payload, timeout=self.timeout)
+        except requests.Timeout:
+            raise HTTPException(
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                detail="Harmonic API request timed out",
+            )
+        except requests.RequestException as e:
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=f"Harmonic API request failed: {str(e)}",
+            )
+
+        if response.status_code != 200:
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=f"Harmonic API request failed with status code {response.status_code}: {response.text}",
+            )
+
+        return response.json()
+
+    async def execute_async(self, query: str, variables: Optional[dict] = None):
+        # The pooled session is shared with the sync path; run it off the event loop
+        return await anyio.to_thread.run_sync(
+            partial(self.execute, query, variables), abandon_on_cancel=True
+        )
+
+
+_client: Optional[HarmonicClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> HarmonicClient:
+    global _client
+
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HarmonicClient(
+                    url=settings.harmonic_api_url,
+                    api_key=settings.harmonic_api_key,
+                    connect_timeout=settings.harmonic_connect_timeout,
+                    read_timeout=settings.harmonic_read_timeout,
+                    pool_size=settings.harmonic_pool_size,
+                )
+
+    return _client
+
+
+@lru_cache(maxsize=None)
+def person_ids_query(fields: Sequence[str]) -> str:
+    selection = "\n".join(PERSON_FIELD_SELECTIONS.get(field, field) for field in fields)
+    return f"""
+        query Query($getPersonByIdsIds: [Int!]!) {{
+            getPersonsByIds(ids: $getPersonByIdsIds) {{
+                {selection}
+            }}
+        }}
+    """
+
+
+TEAM_CONNECTIONS_QUERY = """
+    query Query($getCompanyByIdId: Int!) {
+        getCompanyById(id: $getCompanyByIdId) {
+            userConnections {
+                user {
+                    email
+                    name
+                }
+            }
+        }
+    }
+"""
+
+
+# Same as TEAM_CONNECTIONS_QUERY, for several companies in one request
+COMPANIES_TEAM_CONNECTIONS_QUERY = """
+    query Query($ids: [Int!]!) {
+        getCompaniesByIds(ids: $ids) {
+            id
+            userConnections {
+                user {
+                    email
+                    name
+                }
+            }
+        }
+    }
+"""
+
+
+def get_all_employees(employee_ids, fields: Sequence[str] = PERSON_DETAIL_FIELDS):
+    variables = {"getPersonByIdsIds": employee_ids}
+    return get_client().execute(person_ids_query(fields), variables)
+
+
+async def get_all_employees_async(
+    employee_ids, fields: Sequence[str] = PERSON_DETAIL_FIELDS
+):
+    variables = {"getPersonByIdsIds": employee_ids}
+    return await get_client().execute_async(person_ids_query(fields), variables)
+
+
+def get_all_team_connections(company_id: int):
+    variables = {"getCompanyByIdId": company_id}
+    return get_client().execute(TEAM_CONNECTIONS_QUERY, variables)
+
+
+async def get_all_team_connections_async(company_id: int):
+    variables = {"getCompanyByIdId": company_id}
+    return await get_client().execute_async(TEAM_CONNECTIONS_QUERY, variables)
+
+
+async def get_companies_team_connections_async(company_ids: List[int]):
+    variables = {"ids": company_ids}
+    return await get_client().execute_async(COMPANIES_TEAM_CONNECTIONS_QUERY, variables)
+
+
+async def gather_with_deadline(*aws: Awaitable, timeout: float) -> List:
+    """
+    Run `aws` concurrently and return their results in order. Anything that fails, or
+    is still running once `timeout` seconds have passed, comes back as None so the
+    caller can serve partial data.
+    """
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    if not tasks:
+        return []
+
+    pending = set(tasks)
+    try:
+        _, pending = await asyncio.wait(tasks, timeout=max(timeout, 0))
+    finally:
+        # Also when the caller is cancelled itself, e.g. on client disconnect
+        for task in pending:
+            task.cancel()
+
+    results = []
+    for task in tasks:
+        if task in pending:
+            logger.warning(
+                "Harmonic request cancelled after exceeding the request deadline"
+            )
+            results.append(None)
+        elif task.exception() is not None:
+            logger.warning("Harmonic request failed: %s", task.exception())
+            results.append(None)
+        else:
+            results.append(task.result())
+
+    return results
@@ -0,0 +1,34 @@
+from functools import lru_cache
+from typing import Any, Mapping, Optional
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from config import settings
+
+
+@lru_cache(maxsize=None)
+def type_adapter(response_type: Any) -> TypeAdapter:
+    return TypeAdapter(response_type)
+
+
+def dump_json(content: Any, response_type: Any, **dump_options) -> bytes:
+    """
+    Validate `content` against `response_type` once, with a cached TypeAdapter, and
+    serialize it straight to JSON bytes, instead of returning it for FastAPI to
+    validate again and encode in Python.
+
+    Dicts are validated as usual. Model instances were validated when they were built
+    and are serialized as they are, unless strict_response_validation is set, which
+    runs them through validation again like FastAPI would.
+    """
+    adapter = type_adapter(response_type)
+    value = adapter.validate_python(content)
+    if settings.strict_response_validation:
+        value = adapter.validate_python(adapter.dump_python(value))
+    return adapter.dump_json(value, **dump_options)
+
+
+def json_response(body: bytes, headers: Optional[Mapping[str, str]] = None) -> Response:
+    """Response for a body from dump_json, with `headers` (e.g. `response.headers`)."""
+    return Response(body, media_type="application/json", headers=headers)
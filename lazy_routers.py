@@ -0,0 +1,43 @@
+import importlib
+import threading
+import time
+from typing import Dict, Sequence
+
+from fastapi import FastAPI
+
+
+class LazyRouters:
+    """
+    Includes route modules in `app` on the first request under one of their path
+    prefixes instead of at import, so a cold start only pays for the routes it serves.
+
+    `groups` maps the first segment of a path to the modules serving it, in the order
+    their routers must be included. Segments sharing routes map to the same modules,
+    which are then included together and only once.
+    """
+
+    def __init__(self, app: FastAPI, groups: Dict[str, Sequence[str]]):
+        self.app = app
+        self.groups = groups
+        self.load_times: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def load(self, *module_names: str) -> None:
+        with self._lock:
+            for module_name in module_names:
+                if module_name in self.load_times:
+                    continue
+
+                started_at = time.perf_counter()
+                module = importlib.import_module(module_name)
+                self.app.include_router(module.router)
+                self.load_times[module_name] = time.perf_counter() - started_at
+
+    def load_path(self, path: str) -> None:
+        module_names = self.groups.get(path.lstrip("/").split("/", 1)[0])
+        if module_names:
+            self.load(*module_names)
+
+    def load_all(self) -> None:
+        for module_names in self.groups.values():
+            self.load(*module_names)
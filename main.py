@@ -1,35 +1,77 @@
+import json
 import os
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import RedirectResponse
+from fastapi.responses import ORJSONResponse, RedirectResponse
 from mangum import Mangum
+from config import settings
+from database import QUERY_COUNT_HEADER, QueryCounter, query_counter
+from lazy_routers import LazyRouters
+from pagination import NEXT_CURSOR_HEADER
+from total_count import TOTAL_COUNT_HEADER, TOTAL_COUNT_TYPE_HEADER
 
 
-from routes.company import (
-    all_company,
-    company_by_id,
-    edit_company_comment,
-    edit_company_relevance,
-    hide_companies,
+COMPANY_ROUTERS = (
+    "routes.company.all_company",
+    "routes.company.company_facets",
+    "routes.company.typeahead_companies",
+    "routes.company.export_companies",
+    "routes.company.companies_batch",
+    "routes.company.company_by_id",
+    "routes.company.hide_companies",
+    "routes.company.edit_company_comment",
+    "routes.company.edit_company_relevance",
 )
-from routes.signals import all_signals, signal_by_id
-from routes.search import search_by_id, all_search
-from routes.people import (
-    people_by_id,
-    all_people,
-    hide_people,
-    edit_person_comment,
-    edit_person_relevance,
+PEOPLE_ROUTERS = (
+    "routes.people.all_people",
+    "routes.people.people_facets",
+    "routes.people.export_people",
+    "routes.people.people_by_id",
+    "routes.people.hide_people",
+    "routes.people.edit_person_comment",
+    "routes.people.edit_person_relevance",
 )
-from routes.list import (
-    create_list,
-    delete_list,
-    modify_entities_in_list,
-    get_all_lists,
-    get_all_entities_by_list,
+SIGNAL_ROUTERS = (
+    "routes.signals.all_signals",
+    "routes.signals.search_signals",
+    "routes.signals.signal_by_id",
+)
+SEARCH_ROUTERS = (
+    "routes.search.all_search",
+    "routes.search.search_by_id",
+)
+LIST_ROUTERS = (
+    "routes.list.get_all_lists",
+    "routes.list.get_all_entities_by_list",
+    "routes.list.create_list",
+    "routes.list.delete_list",
+    "routes.list.modify_entities_in_list",
+)
+METRICS_ROUTERS = (
+    "routes.metrics.cache_stats",
+    "routes.metrics.db_pool",
 )
 
-app = FastAPI(swagger_ui_parameters={"displayRequestDuration": True})
+# Route modules by the first segment of the paths they serve
+ROUTER_GROUPS = {
+    "companies": COMPANY_ROUTERS,
+    "edit_company_comments": COMPANY_ROUTERS,
+    "edit_company_relevence": COMPANY_ROUTERS,
+    "people": PEOPLE_ROUTERS,
+    "peoples": PEOPLE_ROUTERS,
+    "edit_person_comments": PEOPLE_ROUTERS,
+    "edit_person_relevence": PEOPLE_ROUTERS,
+    "signals": SIGNAL_ROUTERS,
+    "searches": SEARCH_ROUTERS,
+    "lists": LIST_ROUTERS,
+    "delete_lists": LIST_ROUTERS,
+    "metrics": METRICS_ROUTERS,
+}
+
+app = FastAPI(
+    default_response_class=ORJSONResponse,
+    swagger_ui_parameters={"displayRequestDuration": True},
+)
 handler = Mangum(app)
 
 is_lambda = os.environ.get("AWS_LAMBDA_FUNCTION_NAME") is not None
@@ -41,37 +83,57 @@ if not is_lambda:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[
+            NEXT_CURSOR_HEADER,
+            QUERY_COUNT_HEADER,
+            TOTAL_COUNT_HEADER,
+            TOTAL_COUNT_TYPE_HEADER,
+            "ETag",
+        ],
     )
 
+if settings.debug_query_count:
+
+    @app.middleware("http")
+    async def count_queries(request: Request, call_next):
+        counter = QueryCounter()
+        query_counter.set(counter)
+        response = await call_next(request)
+        response.headers[QUERY_COUNT_HEADER] = str(counter.count)
+        return response
+
 
 @app.get("/")
 def read_root():
     return RedirectResponse(url="/docs")
 
 
-app.include_router(all_company.router)
-app.include_router(company_by_id.router)
-app.include_router(hide_companies.router)
-app.include_router(edit_company_comment.router)
-app.include_router(edit_company_relevance.router)
+routers = LazyRouters(app, ROUTER_GROUPS)
+lazy_routers = settings.lazy_routers if settings.lazy_routers is not None else is_lambda
+
+if lazy_routers:
+
+    @app.middleware("http")
+    async def load_routers(request: Request, call_next):
+        routers.load_path(request.url.path)
+        return await call_next(request)
+
+else:
+    routers.load_all()
 
-app.include_router(all_people.router)
-app.include_router(people_by_id.router)
-app.include_router(hide_people.router)
-app.include_router(edit_person_comment.router)
-app.include_router(edit_person_relevance.router)
 
-app.include_router(all_signals.router)
-app.include_router(signal_by_id.router)
+def openapi():
+    if app.openapi_schema is None:
+        if settings.openapi_schema_path:
+            with open(settings.openapi_schema_path) as schema_file:
+                app.openapi_schema = json.load(schema_file)
+        else:
+            routers.load_all()
+    # Generated once from every router, then served from app.openapi_schema
+    return FastAPI.openapi(app)
 
-app.include_router(all_search.router)
-app.include_router(search_by_id.router)
 
-app.include_router(get_all_lists.router)
-app.include_router(get_all_entities_by_list.router)
-app.include_router(create_list.router)
-app.include_router(delete_list.router)
-app.include_router(modify_entities_in_list.router)
+app.openapi = openapi
 
 if __name__ == "__main__":
     import uvicorn
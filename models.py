@@ -10,10 +10,13 @@ from sqlalchemy import (
     Text,
     JSON,
     ForeignKey,
+    Index,
     Table,
+    UniqueConstraint,
     func,
 )
-from sqlalchemy.orm import relationship, foreign
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.orm import deferred, relationship, foreign
 from sqlalchemy.sql import expression
 from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.types import DateTime as SQLAlchemyDateTime
@@ -82,16 +85,24 @@ class Signal(Base):
     created_at = Column(DateTime, default=utcnow(), nullable=False)
     updated_at = Column(DateTime, default=utcnow(), onupdate=utcnow(), nullable=True)
 
+    # Full-text document for /signals/search, kept up to date by a trigger
+    # (see alembic/versions/0005_signal_search_vector.py)
+    search_vector = deferred(Column(TSVECTOR))
+
+    __table_args__ = (
+        Index("ix_signal_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
 
 class Company(Base):
     __tablename__ = "company"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     search_id = Column(Integer)
-    signal_id = Column(Integer)
-    source_company_id = Column(Integer)
+    signal_id = Column(Integer, index=True)
+    source_company_id = Column(Integer, index=True)
     type = Column(Text)
-    name = Column(Text)
+    name = Column(Text, index=True)
     name_aliases = Column(ARRAY(Text))
     legal_name = Column(Text)
     description = Column(Text)
@@ -127,13 +138,25 @@ class Company(Base):
         viewonly=True,
     )
 
+    __table_args__ = (
+        # Fuzzy name search (see alembic/versions/0004_company_trigram_search.py)
+        Index(
+            "ix_company_search_document_trgm",
+            func.company_search_document(name, legal_name, name_aliases).label(
+                "search_document"
+            ),
+            postgresql_using="gin",
+            postgresql_ops={"search_document": "gin_trgm_ops"},
+        ),
+    )
+
 
 class CompanyMetric(Base):
     __tablename__ = "company_metric"
 
     highlights = Column(ARRAY(JSON))
     id = Column(Integer, primary_key=True, autoincrement=True)
-    company_id = Column(Integer, ForeignKey("company.id"))
+    company_id = Column(Integer, ForeignKey("company.id"), index=True)
     stage = Column(Text)
     headcount = Column(Integer)
     traction_metrics = Column(JSON)
@@ -160,9 +183,9 @@ class Person(Base):
     experience = Column(ARRAY(JSON))
     highlights = Column(ARRAY(JSON))
     linkedin_headline = Column(Text)
-    source_person_id = Column(Integer)
+    source_person_id = Column(Integer, index=True)
     search_id = Column(Integer)
-    signal_id = Column(Integer)
+    signal_id = Column(Integer, index=True)
     awards = Column(ARRAY(Text))
     recommendations = Column(ARRAY(Text))
     current_company_urns = Column(ARRAY(Text))
@@ -243,3 +266,73 @@ class ListEntityAssociation(Base):
     __mapper_args__ = {
         "polymorphic_on": entity_type,
     }
+
+    __table_args__ = (
+        UniqueConstraint(
+            list_id, entity_type, entity_id, name="uq_list_entity_association"
+        ),
+        Index("ix_list_entity_association_entity", entity_type, entity_id),
+    )
+
+
+class HarmonicPersonProfile(Base):
+    __tablename__ = "harmonic_person_profile"
+
+    # Persistent tier of the Harmonic person cache, see person_cache.py
+    entity_urn = Column(Text, primary_key=True)
+    profile = Column(JSONB, nullable=False)
+    fetched_at = Column(DateTime, default=utcnow(), nullable=False, index=True)
+
+
+class CompanyFeed(Base):
+    __tablename__ = "company_feed"
+
+    # Latest company per source_company_id, kept up to date by triggers on the
+    # company and company_metric tables (see alembic/versions/0002_company_feed.py)
+    source_company_id = Column(Integer, primary_key=True)
+    company_id = Column(Integer, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    name = Column(Text, nullable=False)
+    is_hidden = Column(Boolean, default=False, nullable=False)
+    company_metric_id = Column(Integer)
+
+    __table_args__ = (
+        Index(
+            "ix_company_feed_visible_order",
+            created_at.desc(),
+            name,
+            company_id.desc(),
+            postgresql_where=(is_hidden == False),
+        ),
+        # Prefix lookups for the typeahead endpoint
+        Index(
+            "ix_company_feed_name_prefix",
+            func.lower(name).label("lower_name"),
+            postgresql_ops={"lower_name": "text_pattern_ops"},
+            postgresql_where=(is_hidden == False),
+        ),
+    )
+
+
+class PersonFeed(Base):
+    __tablename__ = "person_feed"
+
+    # Latest person per source_person_id with its source and list memberships, kept
+    # up to date by triggers (see alembic/versions/0003_person_feed.py)
+    source_person_id = Column(Integer, primary_key=True)
+    person_id = Column(Integer, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    sort_name = Column(Text, nullable=False)
+    source_name = Column(Text)
+    lists = Column(JSON)
+    is_hidden = Column(Boolean, default=False, nullable=False)
+
+    __table_args__ = (
+        Index(
+            "ix_person_feed_visible_order",
+            created_at.desc(),
+            sort_name,
+            person_id.desc(),
+            postgresql_where=(is_hidden == False),
+        ),
+    )
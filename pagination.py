@@ -0,0 +1,108 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import Any, List, NamedTuple, Optional, Sequence
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import BigInteger, and_, or_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class SortKey(NamedTuple):
+    column: Any
+    descending: bool = False
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict) and "dt" in value:
+        return datetime.fromisoformat(value["dt"])
+    if isinstance(value, dict) and "d" in value:
+        return date.fromisoformat(value["d"])
+    return value
+
+
+def _matches_column(value, key: SortKey) -> bool:
+    """Whether a decoded cursor `value` can be compared with the column of `key`."""
+    column_type = key.column.type
+    try:
+        python_type = column_type.python_type
+    except NotImplementedError:
+        return value is not None
+
+    if value is None or isinstance(value, bool) is not (python_type is bool):
+        return False
+    if python_type is float:
+        return isinstance(value, (int, float))
+    if python_type is int:
+        bits = 63 if isinstance(column_type, BigInteger) else 31
+        return isinstance(value, int) and -(2**bits) <= value < 2**bits
+    if python_type is datetime:
+        timezone = getattr(column_type, "timezone", False)
+        return isinstance(value, datetime) and (value.tzinfo is not None) == timezone
+    if python_type is str:
+        return isinstance(value, str) and "\x00" not in value
+    return isinstance(value, python_type)
+
+
+def encode_cursor(values: Sequence) -> str:
+    payload = json.dumps([_encode_value(value) for value in values])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str, keys: Sequence[SortKey]) -> List:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        values = [_decode_value(value) for value in values]
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        values = None
+
+    # Hand-edited cursors must fail here, not when the values are bound to the query
+    if (
+        not isinstance(values, list)
+        or len(values) != len(keys)
+        or not all(_matches_column(value, key) for value, key in zip(values, keys))
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+    return values
+
+
+def keyset_order(keys: Sequence[SortKey]) -> List:
+    return [key.column.desc() if key.descending else key.column.asc() for key in keys]
+
+
+def keyset_after(keys: Sequence[SortKey], cursor: str):
+    """Filter matching the rows that sort strictly after the row `cursor` was taken from."""
+    values = decode_cursor(cursor, keys)
+
+    clauses = []
+    for i, key in enumerate(keys):
+        after = key.column < values[i] if key.descending else key.column > values[i]
+        clauses.append(
+            and_(*[k.column == v for k, v in zip(keys[:i], values[:i])], after)
+        )
+
+    return or_(*clauses)
+
+
+def set_next_cursor(
+    response: Response, rows: Sequence, limit: Optional[int], cursor_values
+) -> None:
+    """
+    Expose the cursor for the page after `rows` in the X-Next-Cursor header. A short
+    page means there is nothing left, so no header is sent.
+    """
+    if rows and limit and len(rows) >= limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(cursor_values(rows[-1]))
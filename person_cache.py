@@ -0,0 +1,173 @@
+import threading
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Dict, List, Sequence
+
+import anyio
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from cache import TTLCache
+from config import settings
+from database import SessionLocal
+from harmonic import PERSON_DETAIL_FIELDS, get_all_employees
+from models import HarmonicPersonProfile
+
+# First tier: hot profiles in process memory
+memory_cache = TTLCache(
+    "harmonic_person",
+    maxsize=settings.harmonic_person_cache_size,
+    ttl=settings.harmonic_person_cache_memory_ttl,
+)
+
+# Second tier counters, reported next to the memory cache stats
+_db_stats = {"hits": 0, "misses": 0, "writes": 0, "errors": 0, "harmonic_fetches": 0}
+_db_stats_lock = threading.Lock()
+
+
+def _count(counter: str, amount: int = 1) -> None:
+    with _db_stats_lock:
+        _db_stats[counter] += amount
+
+
+def db_stats() -> dict:
+    with _db_stats_lock:
+        stats = dict(_db_stats)
+
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = stats["hits"] / lookups if lookups else None
+    stats["ttl"] = settings.harmonic_person_cache_ttl
+    return stats
+
+
+def person_id_from_urn(entity_urn: str) -> int:
+    return int(entity_urn.split(":")[-1])
+
+
+def _has_fields(profile: dict, fields: Sequence[str]) -> bool:
+    return all(field in profile for field in fields)
+
+
+def _load_profiles(entity_urns: List[str]) -> Dict[str, dict]:
+    fresh_after = datetime.utcnow() - timedelta(
+        seconds=settings.harmonic_person_cache_ttl
+    )
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(HarmonicPersonProfile.entity_urn, HarmonicPersonProfile.profile)
+            .filter(
+                HarmonicPersonProfile.entity_urn.in_(entity_urns),
+                HarmonicPersonProfile.fetched_at >= fresh_after,
+            )
+            .all()
+        )
+        return {entity_urn: profile for entity_urn, profile in rows}
+    except SQLAlchemyError as e:
+        print(f"SQLAlchemyError while reading person cache: {e}")
+        _count("errors")
+        return {}
+    finally:
+        db.close()
+
+
+def _store_profiles(profiles: List[dict]) -> None:
+    statement = insert(HarmonicPersonProfile).values(
+        [
+            {"entity_urn": profile["entityUrn"], "profile": profile}
+            for profile in profiles
+        ]
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[HarmonicPersonProfile.entity_urn],
+        set_={
+            "profile": HarmonicPersonProfile.profile.op("||")(
+                statement.excluded.profile
+            ),
+            "fetched_at": func.timezone("utc", func.current_timestamp()),
+        },
+    )
+
+    db = SessionLocal()
+    try:
+        db.execute(statement)
+        db.commit()
+        _count("writes", len(profiles))
+    except SQLAlchemyError as e:
+        db.rollback()
+        print(f"SQLAlchemyError while writing person cache: {e}")
+        _count("errors")
+    finally:
+        db.close()
+
+
+def get_persons_by_urns(
+    entity_urns: Sequence[str], fields: Sequence[str] = PERSON_DETAIL_FIELDS
+) -> List[dict]:
+    """
+    Return Harmonic profiles for `entity_urns`, in request order and without duplicates.
+
+    Profiles are looked up in memory first, then in Postgres, and only the remaining
+    misses are fetched from Harmonic with a single getPersonsByIds call. Callers get
+    copies, so they are free to annotate the returned dicts.
+    """
+    entity_urns = list(dict.fromkeys(urn for urn in entity_urns if urn))
+    found: Dict[str, dict] = {}
+    partial_profiles: Dict[str, dict] = {}
+
+    for entity_urn in entity_urns:
+        profile = memory_cache.get(entity_urn)
+        if profile is None:
+            continue
+        if _has_fields(profile, fields):
+            found[entity_urn] = profile
+        else:
+            partial_profiles[entity_urn] = profile
+
+    misses = [urn for urn in entity_urns if urn not in found]
+    if misses:
+        stored = _load_profiles(misses)
+        for entity_urn in misses:
+            profile = stored.get(entity_urn)
+            if profile is None:
+                continue
+            profile = {**partial_profiles.get(entity_urn, {}), **profile}
+            memory_cache.set(entity_urn, profile)
+            if _has_fields(profile, fields):
+                found[entity_urn] = profile
+            else:
+                partial_profiles[entity_urn] = profile
+
+        _count("hits", sum(1 for urn in misses if urn in found))
+        misses = [urn for urn in misses if urn not in found]
+        _count("misses", len(misses))
+
+    if misses:
+        _count("harmonic_fetches")
+        fetched = get_all_employees(
+            [person_id_from_urn(urn) for urn in misses], fields
+        )["data"]["getPersonsByIds"]
+
+        profiles = []
+        for profile in fetched or []:
+            if not profile or not profile.get("entityUrn"):
+                continue
+            entity_urn = profile["entityUrn"]
+            profile = {**partial_profiles.get(entity_urn, {}), **profile}
+            memory_cache.set(entity_urn, profile)
+            found[entity_urn] = profile
+            profiles.append(profile)
+
+        if profiles:
+            _store_profiles(profiles)
+
+    return [dict(found[urn]) for urn in entity_urns if urn in found]
+
+
+async def get_persons_by_urns_async(
+    entity_urns: Sequence[str], fields: Sequence[str] = PERSON_DETAIL_FIELDS
+) -> List[dict]:
+    return await anyio.to_thread.run_sync(
+        partial(get_persons_by_urns, entity_urns, fields), abandon_on_cancel=True
+    )
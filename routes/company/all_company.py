@@ -1,17 +1,36 @@
-from fastapi import Depends, APIRouter, HTTPException, Query, status
-from sqlalchemy.orm import Session
+from fastapi import Depends, APIRouter, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased
 from pydantic import BaseModel, HttpUrl
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from sqlalchemy.exc import SQLAlchemyError
+import re
 import traceback
 from datetime import date, datetime
-import requests
-from sqlalchemy import func, or_, select, and_
-from config import settings
-from database import get_db
+from sqlalchemy import func, literal, or_, select, and_
+from database import get_async_db
 from auth import get_current_user
+from feed_cache import (
+    COMPANIES_FEED,
+    company_tag,
+    feed_cache,
+    feed_cache_key,
+    list_tag,
+)
+from harmonic import PERSON_CARD_FIELDS
+from json_response import dump_json, json_response
+from pagination import (
+    NEXT_CURSOR_HEADER,
+    SortKey,
+    keyset_after,
+    keyset_order,
+    set_next_cursor,
+)
+from person_cache import get_persons_by_urns_async
+from total_count import CountMode, count_rows, set_total_count
 from models import (
     Company,
+    CompanyFeed,
     CompanyMetric,
     Signal,
     Source,
@@ -32,6 +51,11 @@ FOUNDING_TITLES = {
     "chief technology officer",
 }
 
+# Matches a title containing any of FOUNDING_TITLES
+FOUNDING_TITLE_PATTERN = re.compile(
+    "|".join(re.escape(title) for title in sorted(FOUNDING_TITLES))
+)
+
 
 class KeyEmployee(BaseModel):
     person: Optional[str] = None
@@ -73,144 +97,106 @@ class AllCompanyResponse(BaseModel):
         from_attributes = True
 
 
-def make_harmonic_request(query, variables=None):
-    url = "https://api.harmonic.ai/graphql"
-    headers = {"Content-Type": "application/json", "apikey": settings.harmonic_api_key}
-    payload = {"query": query}
-    if variables:
-        payload["variables"] = variables
-    response = requests.post(url, json=payload, headers=headers)
-
-    if response.status_code != 200:
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail=f"Harmonic API request failed with status code {response.status_code}: {response.text}",
-        )
+def extract_founders(employees):
+    """Return the founders and founding executives from a CompanyMetric.employees list."""
+    founders = []
+    if not employees or not isinstance(employees, list):
+        return founders
 
-    return response.json()
+    for employee in employees:
+        if not employee or not isinstance(employee, dict):
+            continue
+        if employee.get("role_type", "") == "FOUNDER" or FOUNDING_TITLE_PATTERN.search(
+            (employee.get("title", "") or "").lower()
+        ):
+            founders.append(employee)
 
+    return founders
 
-def get_all_employees(employee_ids):
-    query = """
-        query Query($getPersonByIdsIds: [Int!]!) {
-            getPersonsByIds(ids: $getPersonByIdsIds) {
-                fullName
-                profilePictureUrl
-                entityUrn
-                socials {
-                    linkedin {
-                        url
-                    }
-                }
-            }
-        }
-    """
-    variables = {"getPersonByIdsIds": employee_ids}
-    return make_harmonic_request(query, variables)
 
+def parse_company_data(rows, founders_by_row, harmonic_data):
+    # Index Harmonic profiles once per page instead of scanning them per founder
+    profiles_by_urn = {
+        h.get("entityUrn"): h for h in harmonic_data or [] if isinstance(h, dict)
+    }
 
-def parse_company_data(rows, harmonic_data, list_id=None):
     companies_data = []
 
-    for i, row in enumerate(rows):
+    for row, founders in zip(rows, founders_by_row):
         try:
-            data = {column: getattr(row, column) for column in row._fields}
-            employees = data.get("employees", [])
-
             unique_employees = set()
             key_employees = []
-            if employees and isinstance(employees, list):
-                for employee in employees:
-                    if employee and isinstance(employee, dict):
-                        if (employee.get("role_type", "") == "FOUNDER") or any(
-                            key_title in (employee.get("title", "") or "").lower()
-                            for key_title in FOUNDING_TITLES
-                        ):
-                            entityUrn = employee.get("person")
-                            if harmonic_data and isinstance(harmonic_data, list):
-                                h_employee = next(
-                                    (
-                                        h
-                                        for h in harmonic_data
-                                        if h.get("entityUrn") == entityUrn
-                                    ),
-                                    None,
-                                )
-                                if h_employee:
-                                    employee_name = h_employee.get("fullName", "-")
-                                    if (
-                                        employee_name
-                                        and employee_name not in unique_employees
-                                        and employee_name != "-"
-                                    ):
-                                        unique_employees.add(employee_name)
-                                        key_employees.append(
-                                            {
-                                                "person": employee_name,
-                                                "title": employee.get("title", "-"),
-                                                "entityUrn": entityUrn,
-                                            }
-                                        )
-            data["key_employees"] = key_employees
-
-            if harmonic_data is None:
-                harmonic_data = []
-
-            for employee in key_employees:
-                entityUrn = employee["person"]
-                h_employee = next(
-                    (h for h in harmonic_data if h["entityUrn"] == entityUrn), None
-                )
-                if h_employee:
-                    employee["entityUrn"] = entityUrn
-                    employee["person"] = h_employee["fullName"]
-
-            location = data.get("location", {})
-            data["location"] = (
-                ", ".join(str(value) for value in location.values() if value)
-                if isinstance(location, dict)
-                else ""
-            )
-
-            website_urls = data.get("website_urls", {})
-            data["website_urls"] = website_urls.get("url", "")
-
-            investors = [
-                {"name": investor["name"], "entity_urn": investor["entity_urn"]}
-                for investor in data.get("funding", {}).get("investors", [])
-            ]
-            data["investors"] = investors
-
-            funding_data = data.get("funding", {}) or {}
-            investors = [
-                {
-                    "name": investor.get("name", "-"),
-                    "entity_urn": investor.get("entity_urn", "-"),
-                }
-                for investor in funding_data.get("investors", [])
-                if investor and isinstance(investor, dict)
-            ]
-            data["investors"] = investors
-
-            data["most_recent_round"] = funding_data.get("last_funding_at", "-")
-            if data["most_recent_round"] and data["most_recent_round"] != "-":
+            for employee in founders:
+                entityUrn = employee.get("person")
+                h_employee = profiles_by_urn.get(entityUrn)
+                if not h_employee:
+                    continue
+
+                employee_name = h_employee.get("fullName", "-")
+                if (
+                    employee_name
+                    and employee_name not in unique_employees
+                    and employee_name != "-"
+                ):
+                    unique_employees.add(employee_name)
+                    key_employees.append(
+                        {
+                            "person": employee_name,
+                            "title": employee.get("title", "-"),
+                            "entityUrn": entityUrn,
+                        }
+                    )
+
+            location = row.location
+            website_urls = row.website_urls or {}
+            funding_data = row.funding or {}
+
+            most_recent_round = funding_data.get("last_funding_at", "-")
+            if most_recent_round and most_recent_round != "-":
                 try:
-                    data["most_recent_round"] = str(data["most_recent_round"])
+                    most_recent_round = str(most_recent_round)
                 except (ValueError, TypeError):
-                    data["most_recent_round"] = "-"
+                    most_recent_round = "-"
 
-            data["most_recent_round_size"] = funding_data.get("last_funding_total", 0.0)
             try:
-                data["most_recent_round_size"] = float(
-                    data["most_recent_round_size"] or 0.0
+                most_recent_round_size = float(
+                    funding_data.get("last_funding_total", 0.0) or 0.0
                 )
             except (ValueError, TypeError):
-                data["most_recent_round_size"] = 0.0
+                most_recent_round_size = 0.0
 
-            if list_id is not None:
-                data["added_at"] = row.added_at
-            data["rank"] = data.get("rank")
-            companies_data.append(data)
+            companies_data.append(
+                {
+                    "id": row.id,
+                    "name": row.name,
+                    "website_urls": website_urls.get("url") or None,
+                    "description": row.description,
+                    "location": (
+                        ", ".join(str(value) for value in location.values() if value)
+                        if isinstance(location, dict)
+                        else ""
+                    ),
+                    "source_name": row.source_name,
+                    "created_at": row.created_at,
+                    "investors": [
+                        {
+                            "name": investor.get("name", "-"),
+                            "entity_urn": investor.get("entity_urn", "-"),
+                        }
+                        for investor in funding_data.get("investors", []) or []
+                        if investor and isinstance(investor, dict)
+                    ],
+                    "most_recent_round": most_recent_round,
+                    "most_recent_round_size": most_recent_round_size,
+                    "key_employees": key_employees,
+                    "comments": row.comments,
+                    "relevence_stage": row.relevence_stage,
+                    "is_hidden": row.is_hidden,
+                    "lists": row.lists,
+                    "added_at": row.added_at,
+                    "rank": row.rank,
+                }
+            )
 
         except KeyError as e:
             raise HTTPException(
@@ -226,7 +212,14 @@ def parse_company_data(rows, harmonic_data, list_id=None):
     return companies_data
 
 
-def search_companies_by_name(
+COMPANY_SORT_KEYS = [
+    SortKey(CompanyFeed.created_at, descending=True),
+    SortKey(CompanyFeed.name),
+    SortKey(CompanyFeed.company_id, descending=True),
+]
+
+
+def companies_query(
     db: Session,
     name: Optional[str],
     skip: int = 0,
@@ -234,121 +227,170 @@ def search_companies_by_name(
     list_id: Optional[int] = None,
     created_at: Optional[date] = None,
     source_name: Optional[str] = None,
+    cursor: Optional[str] = None,
+    fuzzy: bool = False,
+    similarity_threshold: float = 0.3,
 ):
-    try:
-        # Subquery to aggregate lists associated with each company, including added_at
-        list_subquery = (
-            select(
-                ListEntityAssociation.entity_id.label("company_id"),
-                func.json_agg(
-                    func.json_build_object("id", DBList.id, "name", DBList.name)
-                ).label("lists"),
-                func.min(ListEntityAssociation.created_at).label("added_at"),
-            )
-            .join(DBList, ListEntityAssociation.list_id == DBList.id)
-            .where(
-                and_(
-                    ListEntityAssociation.entity_type == "company",
-                    or_(
-                        list_id is None,
-                        ListEntityAssociation.list_id
-                        == list_id,  # Filter for specific list_id if provided
-                    ),
-                )
-            )
-            .group_by(ListEntityAssociation.entity_id)
-            .subquery()
+    """Build the /companies page query, also used by tests/test_query_plans.py."""
+    if fuzzy and name and cursor:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Fuzzy name search is ranked by similarity, paginate it with skip",
         )
 
-        # Subquery to filter unique companies based on source_company_id
-        company_subquery = (
-            db.query(
-                func.max(Company.id).label("id"),
-                func.max(Company.created_at).label("created_at"),
-                func.max(Company.name).label("name"),
-            )
-            .filter(
-                and_(
-                    Company.source_company_id.isnot(None),
-                    Company.source_company_id != 0,
-                    Company.name.isnot(None),
+    # Correlated subqueries for the lists associated with each company, including
+    # added_at, so they are only evaluated for the rows on the requested page
+    association = aliased(ListEntityAssociation)
+    list_filter = and_(
+        association.entity_id == Company.id,
+        association.entity_type == "company",
+        or_(
+            list_id is None,
+            association.list_id == list_id,  # Filter for specific list_id if provided
+        ),
+    )
+    lists_column = (
+        select(
+            func.json_agg(func.json_build_object("id", DBList.id, "name", DBList.name))
+        )
+        .select_from(association)
+        .join(DBList, association.list_id == DBList.id)
+        .where(list_filter)
+        .correlate(Company)
+        .scalar_subquery()
+    )
+    added_at_column = (
+        select(func.min(association.created_at))
+        .select_from(association)
+        .join(DBList, association.list_id == DBList.id)
+        .where(list_filter)
+        .correlate(Company)
+        .scalar_subquery()
+    )
+
+    # company_feed holds one row per source_company_id with the feed sort keys
+    query = (
+        db.query(
+            CompanyFeed.company_id.label("id"),
+            CompanyFeed.created_at,
+            CompanyFeed.name,
+            Company.source_company_id,
+            Company.website_urls,
+            Company.description,
+            Company.location,
+            Company.comments,
+            Company.relevence_stage,
+            Company.is_hidden,
+            Company.rank,
+            CompanyMetric.employees,
+            CompanyMetric.funding,
+            CompanyMetric.funding_rounds,
+            Source.name.label("source_name"),
+            lists_column.label("lists"),
+            added_at_column.label("added_at"),
+        )
+        .join(Company, Company.id == CompanyFeed.company_id)
+        .join(CompanyMetric, CompanyMetric.id == CompanyFeed.company_metric_id)
+        .outerjoin(Signal, Company.signal_id == Signal.id)
+        .outerjoin(Source, Signal.source_id == Source.id)
+        .filter(CompanyFeed.is_hidden == False)
+        .order_by(*keyset_order(COMPANY_SORT_KEYS))
+    )
+
+    # Fuzzy name search over the trigram-indexed name/legal name/alias document,
+    # ranked by similarity and then by the usual feed order
+    if name and fuzzy:
+        term = name.lower()
+        document = func.company_search_document(
+            Company.name, Company.legal_name, Company.name_aliases
+        )
+        db.execute(
+            select(
+                func.set_config(
+                    "pg_trgm.word_similarity_threshold",
+                    str(similarity_threshold),
+                    True,
                 )
             )
-            .filter(or_(Company.is_hidden == False, Company.is_hidden.is_(None)))
-            .group_by(Company.source_company_id)
-            .subquery()
         )
-
-        # Main query to fetch companies with their metrics and list associations
         query = (
-            db.query(
-                company_subquery.c.id,
-                company_subquery.c.created_at,
-                company_subquery.c.name,
-                Company.source_company_id,
-                Company.website_urls,
-                Company.description,
-                Company.location,
-                Company.comments,
-                Company.relevence_stage,
-                Company.is_hidden,
-                Company.rank,
-                CompanyMetric.employees,
-                CompanyMetric.funding,
-                CompanyMetric.funding_rounds,
-                Source.name.label("source_name"),
-                list_subquery.c.lists,
-                list_subquery.c.added_at,  # Fetch the added_at for the specific list_id
-            )
-            .join(Company, Company.id == company_subquery.c.id)
-            .join(CompanyMetric, Company.id == CompanyMetric.company_id)
-            .outerjoin(Signal, Company.signal_id == Signal.id)
-            .outerjoin(Source, Signal.source_id == Source.id)
-            .outerjoin(list_subquery, Company.id == list_subquery.c.company_id)
+            query.filter(literal(term).op("<%", is_comparison=True)(document))
+            .order_by(None)
             .order_by(
-                company_subquery.c.created_at.desc(), company_subquery.c.name.asc()
+                func.word_similarity(term, document).desc(),
+                *keyset_order(COMPANY_SORT_KEYS),
             )
         )
 
-        # Filter by name if provided
-        if name:
-            query = query.filter(
-                or_(
-                    Company.name.ilike(f"%{name}%"),
-                    Company.legal_name.ilike(f"%{name}%"),
-                    Company.name_aliases.any(name),
-                )
+    # Filter by name if provided
+    elif name:
+        query = query.filter(
+            or_(
+                Company.name.ilike(f"%{name}%"),
+                Company.legal_name.ilike(f"%{name}%"),
+                Company.name_aliases.any(name),
             )
+        )
 
-        # Filter by source_name if provided
-        if source_name:
-            query = query.filter(Source.name == source_name)
-
-        # Filter by list_id if provided
-        if list_id is not None:
-            query = query.join(
-                ListEntityAssociation, Company.id == ListEntityAssociation.entity_id
-            ).filter(
-                and_(
-                    ListEntityAssociation.entity_type == "company",
-                    ListEntityAssociation.list_id
-                    == list_id,  # Filter for specific list_id
-                )
+    # Filter by source_name if provided
+    if source_name:
+        query = query.filter(Source.name == source_name)
+
+    # Filter by list_id if provided
+    if list_id is not None:
+        query = query.join(
+            ListEntityAssociation, Company.id == ListEntityAssociation.entity_id
+        ).filter(
+            and_(
+                ListEntityAssociation.entity_type == "company",
+                ListEntityAssociation.list_id == list_id,  # Filter for specific list_id
             )
+        )
 
-        if created_at:
-            query = query.filter(
-                func.date(Company.created_at) == created_at  # Filter by date
-            )
+    if created_at:
+        query = query.filter(
+            func.date(Company.created_at) == created_at  # Filter by date
+        )
+
+    # Apply pagination
+    if cursor:
+        query = query.filter(keyset_after(COMPANY_SORT_KEYS, cursor))
+    if skip:
+        query = query.offset(skip)
+    if limit:
+        query = query.limit(limit)
 
-        # Apply pagination
-        if skip:
-            query = query.offset(skip)
-        if limit:
-            query = query.limit(limit)
+    return query
 
-        return query.all()
 
+def search_companies_by_name(
+    db: Session,
+    name: Optional[str],
+    skip: int = 0,
+    limit: int = 10,
+    list_id: Optional[int] = None,
+    created_at: Optional[date] = None,
+    source_name: Optional[str] = None,
+    cursor: Optional[str] = None,
+    fuzzy: bool = False,
+    similarity_threshold: float = 0.3,
+):
+    try:
+        return companies_query(
+            db,
+            name,
+            skip,
+            limit,
+            list_id,
+            created_at,
+            source_name,
+            cursor,
+            fuzzy,
+            similarity_threshold,
+        ).all()
+
+    except HTTPException as e:
+        raise e
     except SQLAlchemyError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -361,8 +403,78 @@ def search_companies_by_name(
         )
 
 
+def count_companies(
+    db: Session,
+    mode: CountMode,
+    name: Optional[str],
+    list_id: Optional[int],
+    created_at: Optional[date],
+    source_name: Optional[str],
+    fuzzy: bool,
+    similarity_threshold: float,
+) -> Tuple[int, str]:
+    query = companies_query(
+        db,
+        name,
+        limit=None,
+        list_id=list_id,
+        created_at=created_at,
+        source_name=source_name,
+        fuzzy=fuzzy,
+        similarity_threshold=similarity_threshold,
+    ).with_entities(CompanyFeed.company_id)
+    filtered = bool(name or created_at or source_name) or list_id is not None
+    return count_rows(db, query, mode, filtered)
+
+
+async def get_companies_total(
+    db: AsyncSession,
+    mode: CountMode,
+    name: Optional[str],
+    list_id: Optional[int],
+    created_at: Optional[date],
+    source_name: Optional[str],
+    fuzzy: bool,
+    similarity_threshold: float,
+) -> Tuple[int, str]:
+    """Total of the /companies filter combination, cached like its pages."""
+    cache_key = feed_cache_key(
+        COMPANIES_FEED,
+        count=mode,
+        name=name,
+        list_id=list_id,
+        created_at=created_at,
+        source_name=source_name,
+        fuzzy=fuzzy and bool(name),
+        similarity_threshold=similarity_threshold if fuzzy and name else None,
+    )
+    total = feed_cache.get(cache_key)
+    if total is not None:
+        return total
+
+    cache_version = feed_cache.version
+    total = await db.run_sync(
+        count_companies,
+        mode,
+        name,
+        list_id,
+        created_at,
+        source_name,
+        fuzzy,
+        similarity_threshold,
+    )
+
+    # Edits to a company don't change the total, only hiding and list changes do
+    tags = [COMPANIES_FEED]
+    if list_id is not None:
+        tags.append(list_tag(list_id))
+    feed_cache.set(cache_key, total, tags=tags, version=cache_version)
+    return total
+
+
 @router.get("/companies", response_model=List[AllCompanyResponse])
-def get_companies(
+async def get_companies(
+    response: Response,
     name: Optional[str] = None,
     skip: int = 0,
     limit: int = 10,
@@ -371,41 +483,113 @@ def get_companies(
         None, description="Filter people by creation date"
     ),
     source_name: Optional[str] = None,
+    cursor: Optional[str] = Query(
+        None,
+        description="Opaque cursor from the X-Next-Cursor header of the previous page",
+    ),
+    fuzzy: bool = Query(
+        False,
+        description="Match name by trigram similarity against names, legal names and aliases",
+    ),
+    similarity_threshold: float = Query(
+        0.3, ge=0, le=1, description="Minimum word similarity for fuzzy matches"
+    ),
+    count: Optional[CountMode] = Query(
+        None,
+        description="Return the total matching companies in X-Total-Count: exact, "
+        "or estimated from table statistics when no filter is applied",
+    ),
     _=Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     try:
-        company_rows = search_companies_by_name(
-            db, name, skip, limit, list_id, created_at, source_name
+        if count:
+            set_total_count(
+                response,
+                await get_companies_total(
+                    db,
+                    count,
+                    name,
+                    list_id,
+                    created_at,
+                    source_name,
+                    fuzzy,
+                    similarity_threshold,
+                ),
+            )
+
+        cache_key = feed_cache_key(
+            COMPANIES_FEED,
+            name=name,
+            skip=skip,
+            limit=limit,
+            list_id=list_id,
+            created_at=created_at,
+            source_name=source_name,
+            cursor=cursor,
+            fuzzy=fuzzy and bool(name),
+            similarity_threshold=similarity_threshold if fuzzy and name else None,
         )
+        # Pages are cached serialized, so a hit costs no validation or encoding
+        cached = feed_cache.get(cache_key)
+        if cached is not None:
+            body, next_cursor = cached
+            if next_cursor:
+                response.headers[NEXT_CURSOR_HEADER] = next_cursor
+            return json_response(body, response.headers)
+
+        cache_version = feed_cache.version
+        company_rows = await db.run_sync(
+            search_companies_by_name,
+            name,
+            skip,
+            limit,
+            list_id,
+            created_at,
+            source_name,
+            cursor,
+            fuzzy=fuzzy,
+            similarity_threshold=similarity_threshold,
+        )
+        if not (fuzzy and name):
+            set_next_cursor(
+                response,
+                company_rows,
+                limit,
+                lambda row: (row.created_at, row.name, row.id),
+            )
 
-        # Collect all employee IDs from the company rows
-        all_employee_ids = []
-        for row in company_rows:
-            employees = row.employees or []
-            key_employees = [
-                int(employee["person"].split(":")[-1])
-                for employee in employees
-                if (employee.get("role_type", "") == "FOUNDER")
-                or any(
-                    key_title in employee.get("title", "").lower()
-                    for key_title in FOUNDING_TITLES
-                    if employee.get("title", "") != None
-                )
-            ]
-            all_employee_ids.extend(key_employees)
+        # Classify founders once per row; both the Harmonic lookup and parsing reuse it
+        founders_by_row = [extract_founders(row.employees) for row in company_rows]
+        all_employee_urns = [
+            founder.get("person")
+            for founders in founders_by_row
+            for founder in founders
+        ]
 
-        # Batch Harmonic API call
+        # Cached profiles, with a single batched Harmonic call for the misses
         harmonic_data = (
-            get_all_employees(all_employee_ids)["data"]["getPersonsByIds"]
-            if all_employee_ids
+            await get_persons_by_urns_async(all_employee_urns, PERSON_CARD_FIELDS)
+            if all_employee_urns
             else []
         )
 
         # Parse company data with harmonic employee data
-        companies = parse_company_data(company_rows, harmonic_data, list_id)
+        companies = parse_company_data(company_rows, founders_by_row, harmonic_data)
+        body = dump_json(companies, List[AllCompanyResponse])
+
+        tags = [COMPANIES_FEED]
+        tags += [company_tag(row.source_company_id) for row in company_rows]
+        if list_id is not None:
+            tags.append(list_tag(list_id))
+        feed_cache.set(
+            cache_key,
+            (body, response.headers.get(NEXT_CURSOR_HEADER)),
+            tags=tags,
+            version=cache_version,
+        )
 
-        return companies
+        return json_response(body, response.headers)
 
     except HTTPException as e:
         traceback.print_exc()
@@ -0,0 +1,149 @@
+import time
+from fastapi import Depends, APIRouter, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
+from pydantic import BaseModel, Field, ValidationError
+from typing import Dict, List
+from database import get_async_db
+from auth import get_current_user
+from config import settings
+from harmonic import gather_with_deadline, get_companies_team_connections_async
+from json_response import dump_json, json_response
+from person_cache import get_persons_by_urns_async
+from routes.company.company_by_id import (
+    CompanyResponse,
+    build_company_response,
+    companies_data_query,
+    parse_team_connections,
+    with_titles,
+)
+
+router = APIRouter()
+
+
+class CompanyBatchRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=100)
+
+
+class CompanyBatchError(BaseModel):
+    status_code: int
+    detail: str
+
+
+class CompanyBatchResponse(BaseModel):
+    results: Dict[int, CompanyResponse]
+    errors: Dict[int, CompanyBatchError]
+
+
+def get_companies_data(company_ids: List[int], db: Session):
+    rows = {}
+    for row in companies_data_query(company_ids, db).all():
+        rows.setdefault(row.id, row)
+    return rows
+
+
+async def fetch_profiles(rows):
+    person_urns = [
+        employee["person"]
+        for row in rows
+        for employee in row.employees or []
+        if employee.get("person")
+    ]
+    if not person_urns:
+        return {}
+
+    profiles = await get_persons_by_urns_async(person_urns)
+    return {profile["entityUrn"]: profile for profile in profiles}
+
+
+async def fetch_team_connections(rows):
+    source_company_ids = list(
+        {row.source_company_id for row in rows if row.source_company_id}
+    )
+    if not source_company_ids:
+        return {}
+
+    companies = (await get_companies_team_connections_async(source_company_ids))[
+        "data"
+    ]["getCompaniesByIds"]
+    return {
+        company["id"]: parse_team_connections(company.get("userConnections"))
+        for company in companies or []
+        if company
+    }
+
+
+@router.post("/companies/batch", response_model=CompanyBatchResponse)
+async def get_companies_batch(
+    request: CompanyBatchRequest,
+    _=Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    started_at = time.monotonic()
+    company_ids = list(dict.fromkeys(request.ids))
+
+    try:
+        rows = await db.run_sync(
+            lambda session: get_companies_data(company_ids, session)
+        )
+
+        # One deduplicated person lookup and one team connections call for the batch
+        profiles_by_urn, team_connections_by_id = await gather_with_deadline(
+            fetch_profiles(rows.values()),
+            fetch_team_connections(rows.values()),
+            timeout=settings.harmonic_request_deadline
+            - (time.monotonic() - started_at),
+        )
+
+        results = {}
+        errors = {}
+        for company_id in company_ids:
+            row = rows.get(company_id)
+            if row is None:
+                errors[company_id] = CompanyBatchError(
+                    status_code=status.HTTP_404_NOT_FOUND, detail="Company not found"
+                )
+                continue
+
+            employees = None
+            if profiles_by_urn is not None and row.employees:
+                employees = with_titles(
+                    row.employees,
+                    [
+                        profiles_by_urn[urn]
+                        for urn in dict.fromkeys(
+                            employee.get("person") for employee in row.employees
+                        )
+                        if urn in profiles_by_urn
+                    ],
+                )
+
+            team_connections = None
+            if team_connections_by_id is not None:
+                team_connections = team_connections_by_id.get(row.source_company_id, [])
+
+            try:
+                results[company_id] = build_company_response(
+                    row, employees, team_connections
+                )
+            except ValidationError as e:
+                print(f"ValidationError for company {company_id}: {e}")
+                errors[company_id] = CompanyBatchError(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="Internal server error",
+                )
+
+        return json_response(
+            dump_json(
+                CompanyBatchResponse(results=results, errors=errors),
+                CompanyBatchResponse,
+            )
+        )
+
+    except SQLAlchemyError as e:
+        print(f"SQLAlchemyError: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error",
+        )
@@ -1,15 +1,21 @@
-from fastapi import Depends, APIRouter, HTTPException, status
-from sqlalchemy import case, distinct, func
-from sqlalchemy.orm import Session
+import time
+from fastapi import Depends, APIRouter, HTTPException, Query, Request, status
+from sqlalchemy import distinct, func, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased
 from sqlalchemy.exc import SQLAlchemyError
 from models import Company, CompanyMetric
-from database import get_db
+from database import get_async_db
 from auth import get_current_user
 from pydantic import BaseModel, validator
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
 from config import settings
-import requests
+from etag import etag_matches, make_etag, not_modified, row_version
+from harmonic import gather_with_deadline, get_all_team_connections_async
+from json_response import dump_json, json_response
+from person_cache import get_persons_by_urns_async
 
 
 class Contact(BaseModel):
@@ -37,8 +43,8 @@ class Location(BaseModel):
     state: Optional[str] = None
     zip: Optional[str] = None
     country: Optional[str] = None
-    
-    @validator('zip', pre=True, always=True)
+
+    @validator("zip", pre=True, always=True)
     def ensure_zip_is_string(cls, value):
         if value is not None:
             return str(value)
@@ -227,193 +233,309 @@ class CompanyResponse(BaseModel):
 router = APIRouter()
 
 
-def get_company_data(company_id: int, db: Session):
-    company_counts_subquery = (
-        db.query(
-            Company.name.label("name"),
-            func.array_agg(case((Company.signal_id != None, Company.signal_id)))
-            .filter(Company.signal_id != None)
-            .label("signal_ids"),
-            func.array_agg(case((Company.search_id != None, Company.search_id)))
-            .filter(Company.search_id != None)
-            .label("search_ids"),
+# Fields of every detail response, whatever `fields` asks for
+REQUIRED_FIELDS = ("id", "created_at", "updated_at")
+COMPANY_FIELDS = tuple(CompanyResponse.model_fields)
+
+CompanyFields = Tuple[str, ...]
+
+
+def company_fields(fields: Optional[str]) -> CompanyFields:
+    """CompanyResponse fields selected by a comma separated `fields`, in model order."""
+    if fields is None:
+        return COMPANY_FIELDS
+
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - set(COMPANY_FIELDS)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}",
         )
-        .group_by(Company.name)
-        .subquery()
+
+    return tuple(
+        field
+        for field in COMPANY_FIELDS
+        if field in requested or field in REQUIRED_FIELDS
     )
 
-    query = (
-        db.query(
-            Company,
-            company_counts_subquery.c.signal_ids,
-            company_counts_subquery.c.search_ids,
-            CompanyMetric.stage,
-            CompanyMetric.headcount,
-            CompanyMetric.traction_metrics,
-            CompanyMetric.funding,
-            CompanyMetric.employees,
-            CompanyMetric.employee_highlights,
-            CompanyMetric.investor_urn,
-            CompanyMetric.funding_rounds,
-        )
-        .filter(Company.id == company_id)
-        .outerjoin(
-            company_counts_subquery, Company.name == company_counts_subquery.c.name
-        )
+
+def _field_columns():
+    """The columns each CompanyResponse field is built from, by label."""
+    # Signal and search ids of every company sharing this company's name
+    same_name = aliased(Company)
+    signal_ids = (
+        select(func.array_agg(same_name.signal_id))
+        .where(same_name.name == Company.name, same_name.signal_id != None)
+        .correlate(Company)
+        .scalar_subquery()
+    )
+    search_ids = (
+        select(func.array_agg(same_name.search_id))
+        .where(same_name.name == Company.name, same_name.search_id != None)
+        .correlate(Company)
+        .scalar_subquery()
+    )
+
+    columns = {
+        field: {field: getattr(Company, field)}
+        for field in COMPANY_FIELDS
+        if hasattr(Company, field)
+    }
+    columns.update(
+        {
+            "total_signals": {"total_signals": signal_ids},
+            "total_searches": {"total_searches": search_ids},
+            "stage": {"stage": CompanyMetric.stage},
+            "headcount": {"headcount": CompanyMetric.headcount},
+            "traction_metrics": {"traction_metrics": CompanyMetric.traction_metrics},
+            "funding": {"funding": CompanyMetric.funding},
+            "employee_highlights": {
+                "employee_highlights": CompanyMetric.employee_highlights
+            },
+            "investor_urn": {"investor_urn": CompanyMetric.investor_urn},
+            "funding_rounds": {"funding_rounds": CompanyMetric.funding_rounds},
+            # Harmonic data, looked up from these
+            "employees": {"employees": CompanyMetric.employees},
+            "team_connections": {"source_company_id": Company.source_company_id},
+        }
+    )
+    return columns
+
+
+def _company_data_query(db: Session, fields: CompanyFields = COMPANY_FIELDS):
+    field_columns = _field_columns()
+    columns = {}
+    for field in fields:
+        columns.update(field_columns[field])
+
+    return (
+        db.query(*(column.label(label) for label, column in columns.items()))
+        .select_from(Company)
         .join(CompanyMetric, Company.id == CompanyMetric.company_id)
         .order_by(Company.id)
     )
 
-    result = query.one_or_none()
 
-    return result
+def company_data_query(
+    company_id: int, db: Session, fields: CompanyFields = COMPANY_FIELDS
+):
+    """Build the company detail query, also used by tests/test_query_plans.py."""
+    return _company_data_query(db, fields).filter(Company.id == company_id)
 
 
-def get_all_employees(employee_ids):
-    query = """
-        query Query($getPersonByIdsIds: [Int!]!) {
-            getPersonsByIds(ids: $getPersonByIdsIds) {
-                fullName
-                profilePictureUrl
-                entityUrn
-                socials {
-                    linkedin {
-                        url
-                    }
-                }
-            }         
-        }
-    """
-    variables = {"getPersonByIdsIds": employee_ids}
-    return make_harmonic_request(query, variables)
-
-
-def get_all_team_connections(employee_ids):
-    query = """
-        query Query($getCompanyByIdId: Int!) {
-            getCompanyById(id: $getCompanyByIdId) {
-                userConnections {
-                    user {
-                        email
-                        name
-                    }
-                }
-            }
-        }
-    """
-    variables = {"getCompanyByIdId": employee_ids}
-    return make_harmonic_request(query, variables)
+def companies_data_query(company_ids: List[int], db: Session):
+    # Latest metric first, for companies with more than one
+    return (
+        _company_data_query(db)
+        .filter(Company.id.in_(company_ids))
+        .order_by(CompanyMetric.id.desc())
+    )
+
+
+def get_company_data(
+    company_id: int, db: Session, fields: CompanyFields = COMPANY_FIELDS
+):
+    return company_data_query(company_id, db, fields).one_or_none()
+
+
+def get_company_version(company_id: int, db: Session):
+    """Everything the detail response is built from, minus Harmonic, for its ETag."""
+    metric_versions = (
+        select(
+            func.json_agg(
+                aggregate_order_by(
+                    func.json_build_array(*row_version(CompanyMetric)),
+                    CompanyMetric.id,
+                )
+            )
+        )
+        .where(CompanyMetric.company_id == Company.id)
+        .correlate(Company)
+        .scalar_subquery()
+    )
+    same_name = aliased(Company)
+    same_name_ids = (
+        select(
+            func.json_agg(
+                aggregate_order_by(
+                    func.json_build_array(
+                        same_name.id, same_name.signal_id, same_name.search_id
+                    ),
+                    same_name.id,
+                )
+            )
+        )
+        .where(same_name.name == Company.name)
+        .correlate(Company)
+        .scalar_subquery()
+    )
+
+    row = (
+        db.query(*row_version(Company), metric_versions, same_name_ids)
+        .filter(Company.id == company_id)
+        .one_or_none()
+    )
+    return tuple(row) if row else None
+
+
+async def fetch_employees(employees):
+    person_urns = [employee["person"] for employee in employees or []]
+    if not person_urns:
+        return None
+
+    return with_titles(employees, await get_persons_by_urns_async(person_urns))
+
+
+def with_titles(employees, profiles):
+    """Copies of the Harmonic `profiles` annotated with the titles from `employees`."""
+    titles = {employee.get("person"): employee.get("title") for employee in employees}
+    return [
+        (
+            {**profile, "title": titles[profile.get("entityUrn")]}
+            if profile.get("entityUrn") in titles
+            else dict(profile)
+        )
+        for profile in profiles
+    ]
+
+
+async def fetch_team_connections(source_company_id):
+    harmonic_team_connections = (
+        await get_all_team_connections_async(int(source_company_id))
+    )["data"]["getCompanyById"]["userConnections"]
+
+    return parse_team_connections(harmonic_team_connections)
+
+
+def parse_team_connections(harmonic_team_connections):
+    return [
+        TeamConnection(
+            email=team_connection["user"]["email"],
+            name=team_connection["user"]["name"],
+        )
+        for team_connection in harmonic_team_connections or []
+    ]
 
 
-def make_harmonic_request(query, variables=None):
-    url = "https://api.harmonic.ai/graphql"
-    headers = {"Content-Type": "application/json", "apikey": settings.harmonic_api_key}
-    payload = {
-        "query": query,
+def build_company_response(
+    result, employees, team_connections, fields: CompanyFields = COMPANY_FIELDS
+) -> CompanyResponse:
+    """
+    CompanyResponse from a company_data_query row and its Harmonic data. Only
+    `fields` are set, and validated, so the rest are left out of the response.
+    """
+    data = {
+        field: getattr(result, field)
+        for field in fields
+        if field not in ("employees", "team_connections")
     }
-    if variables:
-        payload["variables"] = variables
-    response = requests.post(url, json=payload, headers=headers)
+    if "employees" in fields:
+        data["employees"] = employees
+    if "team_connections" in fields:
+        data["team_connections"] = team_connections
 
-    if response.status_code == 200:
-        data = response.json()
-        return data
-    else:
-        print(f"Query failed with status code {response.status_code}")
-        print("Response:", response.text)
+    return CompanyResponse(**data)
 
 
-@router.get("/companies/{company_id}", response_model=CompanyResponse)
-def get_companies(
+@router.get(
+    "/companies/{company_id}",
+    response_model=CompanyResponse,
+)
+async def get_companies(
     company_id: int,
+    request: Request,
+    fields: Optional[str] = Query(
+        None,
+        description="Comma separated fields to return, e.g. name,logo_url,stage. "
+        "id, created_at and updated_at are always included. Defaults to all fields.",
+    ),
     _=Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    try:
-        result = get_company_data(company_id, db)
+    started_at = time.monotonic()
 
-        harmonic_employee = None
+    try:
+        fields = company_fields(fields)
 
-        if result:
+        version = await db.run_sync(
+            lambda session: get_company_version(company_id, session)
+        )
+        if not version:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Company not found",
+            )
 
+        # Harmonic data is fetched live, so the tag also rolls over every window
+        uses_harmonic = "employees" in fields or "team_connections" in fields
+        etag = make_etag(
+            "company",
+            version,
+            fields,
             (
-                company,
-                total_signals,
-                total_searches,
-                stage,
-                headcount,
-                traction_metrics,
-                funding,
-                employees,
-                employee_highlights,
-                investor_urn,
-                funding_rounds,
-            ) = result
-
-            person_ids = [
-                int(employee["person"].split(":")[-1]) for employee in employees
-            ]
-
-            if person_ids:
-                harmonic_employee = get_all_employees(person_ids)["data"][
-                    "getPersonsByIds"
-                ]
-
-            if employees and harmonic_employee:
-                for employee in employees:
-                    for employee_harmonic in harmonic_employee:
-                        if employee.get("person") == employee_harmonic.get("entityUrn"):
-                            employee_harmonic["title"] = employee["title"]
-
-            harmonic_team_connections = get_all_team_connections(
-                int(company.source_company_id)
-            )["data"]["getCompanyById"]["userConnections"]
-
-            team_connections = [
-                TeamConnection(
-                    email=team_connection["user"]["email"],
-                    name=team_connection["user"]["name"],
+                int(time.time() // settings.harmonic_etag_window)
+                if uses_harmonic
+                else None
+            ),
+        )
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+        result = await db.run_sync(
+            lambda session: get_company_data(company_id, session, fields)
+        )
+
+        if result:
+            # Only call Harmonic for the sections asked for. Both calls only need the
+            # company row, so run them side by side and fall back to partial data if
+            # they miss the request deadline.
+            harmonic_calls = {}
+            if "employees" in fields:
+                harmonic_calls["employees"] = fetch_employees(result.employees)
+            if "team_connections" in fields:
+                harmonic_calls["team_connections"] = fetch_team_connections(
+                    result.source_company_id
+                )
+            harmonic = dict(
+                zip(
+                    harmonic_calls,
+                    await gather_with_deadline(
+                        *harmonic_calls.values(),
+                        timeout=settings.harmonic_request_deadline
+                        - (time.monotonic() - started_at),
+                    ),
                 )
-                for team_connection in harmonic_team_connections
-            ]
-
-            return CompanyResponse(
-                id=company.id,
-                total_signals=total_signals,
-                total_searches=total_searches,
-                source_company_id=company.source_company_id,
-                type=company.type,
-                name=company.name,
-                name_aliases=company.name_aliases,
-                legal_name=company.legal_name,
-                description=company.description,
-                contact=company.contact,
-                founding_date=company.founding_date,
-                website_urls=company.website_urls,
-                logo_url=company.logo_url,
-                ownership_status=company.ownership_status,
-                location=company.location,
-                tags=company.tags,
-                socials=company.socials,
-                rank=company.rank,
-                related_companies=company.related_companies,
-                created_at=company.created_at,
-                updated_at=company.updated_at,
-                stage=stage,
-                headcount=headcount,
-                traction_metrics=traction_metrics,
-                funding=funding,
-                employees=harmonic_employee,
-                employee_highlights=employee_highlights,
-                investor_urn=investor_urn,
-                funding_rounds=funding_rounds,
-                team_connections=team_connections,
+            )
+            harmonic_employee = harmonic.get("employees")
+            team_connections = harmonic.get("team_connections")
+
+            # Don't let clients hold on to a response missing Harmonic data
+            headers = {}
+            if (
+                "team_connections" not in harmonic or team_connections is not None
+            ) and (
+                "employees" not in harmonic
+                or harmonic_employee is not None
+                or not result.employees
+            ):
+                headers["ETag"] = etag
+
+            company = build_company_response(
+                result, harmonic_employee, team_connections, fields
+            )
+            # Leave the fields that weren't asked for out of the response, rather
+            # than returning them as null
+            return json_response(
+                dump_json(company, CompanyResponse, include=set(fields)), headers
             )
         else:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Company not found",
             )
+    except HTTPException as e:
+        raise e
     except SQLAlchemyError as e:
         print(f"SQLAlchemyError: {e}")
         raise HTTPException(
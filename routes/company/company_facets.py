@@ -0,0 +1,105 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import date
+from auth import get_current_user
+from database import get_async_db
+from facets import FacetsResponse, facets_query, parse_facets
+from feed_cache import COMPANIES_FEED, COMPANY_FACETS, feed_cache, feed_cache_key
+from json_response import dump_json, json_response
+from models import Company, CompanyFeed, Source
+from routes.company.all_company import companies_query
+
+router = APIRouter()
+
+
+def company_facets(
+    db: Session,
+    name: Optional[str],
+    list_id: Optional[int],
+    created_at: Optional[date],
+    source_name: Optional[str],
+    fuzzy: bool,
+    similarity_threshold: float,
+) -> dict:
+    query = companies_query(
+        db,
+        name,
+        limit=None,
+        list_id=list_id,
+        created_at=created_at,
+        source_name=source_name,
+        fuzzy=fuzzy,
+        similarity_threshold=similarity_threshold,
+    )
+    rows = facets_query(
+        query,
+        "company",
+        Company.id,
+        CompanyFeed.source_company_id,
+        Source.name,
+        Company.created_at,
+        Company.relevence_stage,
+    ).all()
+    return parse_facets(rows)
+
+
+@router.get("/companies/facets", response_model=FacetsResponse)
+async def get_company_facets(
+    name: Optional[str] = None,
+    list_id: Optional[int] = None,
+    created_at: Optional[date] = Query(
+        None, description="Filter companies by creation date"
+    ),
+    source_name: Optional[str] = None,
+    fuzzy: bool = False,
+    similarity_threshold: float = Query(0.3, ge=0, le=1),
+    _=Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Companies matching the /companies filters per source, creation day, relevance
+    stage and list, with their total, from one grouped query.
+    """
+    try:
+        cache_key = feed_cache_key(
+            COMPANIES_FEED,
+            facets=True,
+            name=name,
+            list_id=list_id,
+            created_at=created_at,
+            source_name=source_name,
+            fuzzy=fuzzy and bool(name),
+            similarity_threshold=similarity_threshold if fuzzy and name else None,
+        )
+        body = feed_cache.get(cache_key)
+        if body is None:
+            cache_version = feed_cache.version
+            facets = await db.run_sync(
+                company_facets,
+                name,
+                list_id,
+                created_at,
+                source_name,
+                fuzzy,
+                similarity_threshold,
+            )
+            body = dump_json(facets, FacetsResponse)
+            feed_cache.set(
+                cache_key,
+                body,
+                tags=[COMPANIES_FEED, COMPANY_FACETS],
+                version=cache_version,
+            )
+
+        return json_response(body)
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        print(f"Error computing company facets: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Unexpected error: {str(e)}",
+        )
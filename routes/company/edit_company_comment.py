@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 from pydantic import BaseModel
 from auth import get_current_user
-from database import get_db
+from database import get_async_db
+from feed_cache import company_tag, feed_cache
 from models import Company
 
 router = APIRouter()
@@ -17,30 +19,40 @@ class CompanyCommentUpdate(BaseModel):
 @router.post("/edit_company_comments", status_code=status.HTTP_200_OK)
 async def edit_company_comments(
     company_data: CompanyCommentUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _=Depends(get_current_user),
 ):
     try:
-        company = db.query(Company).filter(Company.id == company_data.id).first()
+        company = (
+            await db.execute(
+                select(Company.source_company_id).where(Company.id == company_data.id)
+            )
+        ).first()
 
         if not company:
             raise HTTPException(status_code=404, detail="Company not found")
 
         source_company_id = company.source_company_id
 
-        db.query(Company).filter(Company.source_company_id == source_company_id).update(
-            {Company.comments: company_data.comment}, synchronize_session=False
+        await db.execute(
+            update(Company)
+            .where(Company.source_company_id == source_company_id)
+            .values(comments=company_data.comment)
+            .execution_options(synchronize_session=False)
         )
-        db.commit()
+        await db.commit()
+        feed_cache.invalidate(company_tag(source_company_id))
 
         return {"message": "Comments updated successfully for all related companies"}
 
+    except HTTPException as e:
+        raise e
     except SQLAlchemyError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=500, detail="An error occurred while updating the comments."
         )
 
     except Exception:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="An unexpected error occurred.")
@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 from pydantic import BaseModel
 from auth import get_current_user
-from database import get_db
+from database import get_async_db
+from feed_cache import COMPANY_FACETS, company_tag, feed_cache
 from models import Company
 
 router = APIRouter()
@@ -17,34 +19,43 @@ class CompanyRelevanceUpdate(BaseModel):
 @router.post("/edit_company_relevence", status_code=status.HTTP_200_OK)
 async def edit_company_relevance(
     company_data: CompanyRelevanceUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _=Depends(get_current_user),
 ):
     try:
-        company = db.query(Company).filter(Company.id == company_data.id).first()
+        company = (
+            await db.execute(
+                select(Company.source_company_id).where(Company.id == company_data.id)
+            )
+        ).first()
 
         if not company:
             raise HTTPException(status_code=404, detail="Company not found")
 
         source_company_id = company.source_company_id
 
-        db.query(Company).filter(Company.source_company_id == source_company_id).update(
-            {Company.relevence_stage: company_data.relevence_stage},
-            synchronize_session=False,
+        await db.execute(
+            update(Company)
+            .where(Company.source_company_id == source_company_id)
+            .values(relevence_stage=company_data.relevence_stage)
+            .execution_options(synchronize_session=False)
         )
-        db.commit()
+        await db.commit()
+        feed_cache.invalidate(company_tag(source_company_id), COMPANY_FACETS)
 
         return {
             "message": "Relevance stage updated successfully for all related companies"
         }
 
+    except HTTPException as e:
+        raise e
     except SQLAlchemyError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=500,
             detail="An error occurred while updating the relevance stage.",
         )
 
     except Exception:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="An unexpected error occurred.")
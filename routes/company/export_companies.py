@@ -0,0 +1,102 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Literal, Optional
+from datetime import date
+from auth import get_current_user
+from config import settings
+from database import SessionLocal
+from export import chunked, export_response, joined
+from harmonic import PERSON_CARD_FIELDS
+from person_cache import get_persons_by_urns
+from routes.company.all_company import (
+    AllCompanyResponse,
+    companies_query,
+    extract_founders,
+    parse_company_data,
+)
+
+router = APIRouter()
+
+CSV_COLUMNS = {
+    "id": lambda company: company.id,
+    "name": lambda company: company.name,
+    "website_url": lambda company: company.website_urls,
+    "description": lambda company: company.description,
+    "location": lambda company: company.location,
+    "source_name": lambda company: company.source_name,
+    "created_at": lambda company: company.created_at,
+    "investors": lambda company: joined(i.name for i in company.investors or []),
+    "most_recent_round": lambda company: company.most_recent_round,
+    "most_recent_round_size": lambda company: company.most_recent_round_size,
+    "key_employees": lambda company: joined(
+        f"{employee.person} ({employee.title})"
+        for employee in company.key_employees or []
+    ),
+    "comments": lambda company: company.comments,
+    "relevence_stage": lambda company: company.relevence_stage,
+    "lists": lambda company: joined(l.name for l in company.lists or []),
+    "added_at": lambda company: company.added_at,
+    "rank": lambda company: company.rank,
+}
+
+
+def company_chunks(**filters):
+    # The request session is closed before the body is streamed, so use our own
+    db = SessionLocal()
+    try:
+        rows = companies_query(db, skip=0, limit=None, **filters).yield_per(
+            settings.export_chunk_size
+        )
+
+        for chunk in chunked(rows, settings.export_chunk_size):
+            founders_by_row = [extract_founders(row.employees) for row in chunk]
+            urns = [
+                founder.get("person")
+                for founders in founders_by_row
+                for founder in founders
+            ]
+
+            # One batched Harmonic lookup per chunk; the status line is already sent,
+            # so a failure only leaves this chunk without key employees
+            try:
+                harmonic_data = (
+                    get_persons_by_urns(urns, PERSON_CARD_FIELDS) if urns else []
+                )
+            except HTTPException as e:
+                print(f"Harmonic lookup failed during export: {e.detail}")
+                harmonic_data = []
+
+            yield [
+                AllCompanyResponse.model_validate(company)
+                for company in parse_company_data(chunk, founders_by_row, harmonic_data)
+            ]
+    finally:
+        db.close()
+
+
+@router.get("/companies/export")
+def export_companies(
+    file_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    name: Optional[str] = None,
+    list_id: Optional[int] = None,
+    created_at: Optional[date] = Query(
+        None, description="Filter companies by creation date"
+    ),
+    source_name: Optional[str] = None,
+    fuzzy: bool = False,
+    similarity_threshold: float = Query(0.3, ge=0, le=1),
+    _=Depends(get_current_user),
+):
+    """Stream every company matching the /companies filters, in feed order."""
+    return export_response(
+        company_chunks(
+            name=name,
+            list_id=list_id,
+            created_at=created_at,
+            source_name=source_name,
+            fuzzy=fuzzy,
+            similarity_threshold=similarity_threshold,
+        ),
+        file_format,
+        "companies",
+        CSV_COLUMNS,
+    )
@@ -1,10 +1,12 @@
 from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import ARRAY, Integer, any_, bindparam, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import List
 from auth import get_current_user
 from models import Company
-from database import get_db
+from database import get_async_db
+from feed_cache import COMPANIES_FEED, feed_cache
 
 router = APIRouter()
 
@@ -13,43 +15,77 @@ class HideCompaniesRequest(BaseModel):
     ids: List[int]
 
 
-@router.post("/companies/hide")
-def hide_companies(
+class HideCompaniesResponse(BaseModel):
+    message: str
+    requested: int
+    found: int
+    hidden: int
+
+
+def hide_companies_statement(ids: List[int]):
+    """
+    A single statement hiding the companies with `ids` and every company sharing a
+    source company with one of them, selecting how many of `ids` exist and how many
+    companies it hid.
+    """
+    # One array parameter, however many ids there are
+    requested = (
+        select(Company.id, Company.source_company_id)
+        .where(Company.id == any_(bindparam("ids", ids, type_=ARRAY(Integer))))
+        .cte("requested")
+    )
+    hidden = (
+        update(Company)
+        .where(
+            or_(
+                Company.id.in_(select(requested.c.id)),
+                Company.source_company_id.in_(select(requested.c.source_company_id)),
+            ),
+            Company.is_hidden.isnot(True),
+        )
+        .values(is_hidden=True)
+        .returning(Company.id)
+        .cte("hidden")
+    )
+
+    return select(
+        select(func.count()).select_from(requested).scalar_subquery().label("found"),
+        select(func.count()).select_from(hidden).scalar_subquery().label("hidden"),
+    )
+
+
+@router.post("/companies/hide", response_model=HideCompaniesResponse)
+async def hide_companies(
     request: HideCompaniesRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _=Depends(get_current_user),
 ):
     try:
-        # Fetch the company name from the provided company ID
-        company_to_hide = db.query(Company).filter(Company.id == request.ids[0]).first()
+        ids = list(dict.fromkeys(request.ids))
+        result = (await db.execute(hide_companies_statement(ids))).one()
+        await db.commit()
 
-        if not company_to_hide:
+        if result.found == 0:
             raise HTTPException(
                 status_code=404,
-                detail="No company found with the provided ID",
+                detail="No company found with the provided IDs",
             )
 
-        # Bulk update all companies with the same name
-        result = (
-            db.query(Company)
-            .filter(Company.name == company_to_hide.name)
-            .update({"is_hidden": True}, synchronize_session=False)
-        )
+        if result.hidden:
+            # Hiding shifts every later page of the feed
+            feed_cache.invalidate(COMPANIES_FEED)
 
-        db.commit()
-
-        if result == 0:
-            raise HTTPException(
-                status_code=404,
-                detail=f"No companies found with the name {company_to_hide.name}",
-            )
-
-        return {
-            "message": f"Companies with name '{company_to_hide.name}' hidden successfully"
-        }
+        return HideCompaniesResponse(
+            message="Companies hidden successfully",
+            requested=len(ids),
+            found=result.found,
+            hidden=result.hidden,
+        )
 
-    except Exception as e:
-        db.rollback()
+    except HTTPException:
+        raise
+    except Exception:
+        await db.rollback()
         raise HTTPException(
             status_code=500,
             detail="Internal server error",
@@ -0,0 +1,51 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
+from pydantic import BaseModel
+from typing import List
+from auth import get_current_user
+from database import get_db
+from models import CompanyFeed
+
+router = APIRouter()
+
+
+class CompanyTypeaheadResponse(BaseModel):
+    id: int
+    name: str
+
+
+def typeahead_query(db: Session, q: str, limit: int):
+    """Build the typeahead query, also used by tests/test_query_plans.py."""
+    # Served from the lower(name) prefix index on company_feed
+    lower_name = func.lower(CompanyFeed.name)
+    return (
+        db.query(CompanyFeed.company_id.label("id"), CompanyFeed.name)
+        .filter(
+            CompanyFeed.is_hidden == False,
+            lower_name.startswith(q.lower(), autoescape=True),
+        )
+        .order_by(lower_name, CompanyFeed.company_id.desc())
+        .limit(limit)
+    )
+
+
+@router.get("/companies/typeahead", response_model=List[CompanyTypeaheadResponse])
+def typeahead_companies(
+    q: str = Query(..., min_length=1, description="Prefix of the company name"),
+    limit: int = Query(10, ge=1, le=50),
+    _=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    try:
+        rows = typeahead_query(db, q, limit).all()
+
+        return [{"id": row.id, "name": row.name} for row in rows]
+
+    except SQLAlchemyError as e:
+        print(f"SQLAlchemyError: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error",
+        )
@@ -1,10 +1,11 @@
 from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, Field
 from typing import Literal
 from auth import get_current_user
 from models import List as DBList
-from database import get_db
+from database import get_async_db
 from sqlalchemy.exc import IntegrityError
 from datetime import datetime
 
@@ -28,9 +29,9 @@ class ListResponse(BaseModel):
 
 
 @router.post("/lists", response_model=ListResponse)
-def create_list(
+async def create_list(
     list_data: ListCreateRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _=Depends(get_current_user),
 ):
 
@@ -40,8 +41,10 @@ def create_list(
         )
 
     existing_list = (
-        db.query(DBList).filter_by(name=list_data.name, type=list_data.type).first()
-    )
+        await db.scalars(
+            select(DBList).filter_by(name=list_data.name, type=list_data.type)
+        )
+    ).first()
     if existing_list:
         raise HTTPException(
             status_code=400,
@@ -54,10 +57,10 @@ def create_list(
 
     try:
         db.add(new_list)
-        db.commit()
-        db.refresh(new_list)
+        await db.commit()
+        await db.refresh(new_list)
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=500, detail="Database error occurred while creating the list."
         )
@@ -1,9 +1,11 @@
 from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from auth import get_current_user
 from models import List as DBList, ListEntityAssociation
-from database import get_db
+from database import get_async_db
+from feed_cache import COMPANIES_FEED, PEOPLE_FEED, feed_cache, list_tag
 from sqlalchemy.exc import SQLAlchemyError
 
 router = APIRouter()
@@ -14,28 +16,37 @@ class DeleteListResponse(BaseModel):
 
 
 @router.post("/delete_lists/{list_id}", response_model=DeleteListResponse)
-def delete_list(
+async def delete_list(
     list_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _=Depends(get_current_user),
 ):
     try:
-        db_list = db.query(DBList).filter(DBList.id == list_id).first()
+        db_list = await db.get(DBList, list_id)
 
         if not db_list:
             raise HTTPException(status_code=404, detail="List not found.")
 
-        db.query(ListEntityAssociation).filter(
-            ListEntityAssociation.list_id == list_id
-        ).delete(synchronize_session=False)
+        await db.execute(
+            delete(ListEntityAssociation)
+            .where(ListEntityAssociation.list_id == list_id)
+            .execution_options(synchronize_session=False)
+        )
+
+        list_type = db_list.type
+        await db.delete(db_list)
+        await db.commit()
 
-        db.delete(db_list)
-        db.commit()
+        # Every member's page shows the list, drop the whole feed of that type
+        feed_cache.invalidate(
+            list_tag(list_id),
+            COMPANIES_FEED if list_type == "company" else PEOPLE_FEED,
+        )
 
         return DeleteListResponse(message=f"List with id {list_id} has been deleted.")
 
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=500, detail="Database error occurred while deleting the list."
         )
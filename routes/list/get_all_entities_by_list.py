@@ -37,7 +37,7 @@ def get_entities_by_list(
     db: Session = Depends(get_db),
     _=Depends(get_current_user),
 ):
-    db_list = db.query(DBList).filter(DBList.id == list_id).first()
+    db_list = db.query(DBList.type).filter(DBList.id == list_id).first()
 
     if not db_list:
         raise HTTPException(status_code=404, detail="List not found.")
@@ -47,7 +47,7 @@ def get_entities_by_list(
 
     if db_list.type == "company":
         company_models = (
-            db.query(Company)
+            db.query(Company.id, Company.name)
             .join(ListEntityAssociation, ListEntityAssociation.entity_id == Company.id)
             .filter(
                 ListEntityAssociation.list_id == list_id,
@@ -59,7 +59,7 @@ def get_entities_by_list(
 
     elif db_list.type == "person":
         person_models = (
-            db.query(Person)
+            db.query(Person.id, Person.first_name, Person.last_name)
             .join(ListEntityAssociation, ListEntityAssociation.entity_id == Person.id)
             .filter(
                 ListEntityAssociation.list_id == list_id,
@@ -1,5 +1,17 @@
 from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import (
+    ARRAY,
+    Integer,
+    String,
+    any_,
+    bindparam,
+    delete,
+    func,
+    literal,
+    select,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, Field
 from typing import List, Literal
 from auth import get_current_user
@@ -9,8 +21,15 @@ from models import (
     Company,
     Person,
 )
-from database import get_db
-from datetime import datetime
+from database import get_async_db
+from feed_cache import (
+    COMPANY_FACETS,
+    PEOPLE_FACETS,
+    company_tag,
+    feed_cache,
+    list_tag,
+    person_tag,
+)
 
 router = APIRouter()
 
@@ -27,18 +46,84 @@ class ModifyListRequest(BaseModel):
 class ModifyListResponse(BaseModel):
     message: str
     already_exists: int
+    added: int = 0
+    removed: int = 0
+    missing: int = 0
+
+
+# Model, source id column and cache tags of the entities each list type holds
+LIST_ENTITIES = {
+    "company": (Company, Company.source_company_id, company_tag, COMPANY_FACETS),
+    "person": (Person, Person.source_person_id, person_tag, PEOPLE_FACETS),
+}
+
+
+def modify_list_statement(
+    list_id: int, entity_type: str, operation: str, ids: List[int]
+):
+    """
+    A single statement adding or removing the entities with `ids` to or from a list,
+    selecting how many of `ids` exist, how many memberships changed and the source
+    ids of the entities that changed.
+    """
+    model, source_id, _, _ = LIST_ENTITIES[entity_type]
+
+    # One array parameter, however many ids there are
+    requested = (
+        select(model.id, source_id.label("source_id"))
+        .where(model.id == any_(bindparam("ids", ids, type_=ARRAY(Integer))))
+        .cte("requested")
+    )
+
+    if operation == "add":
+        # Memberships already on the list conflict with uq_list_entity_association
+        changed = (
+            insert(ListEntityAssociation)
+            .from_select(
+                ["list_id", "entity_id", "entity_type"],
+                select(
+                    literal(list_id, Integer),
+                    requested.c.id,
+                    literal(entity_type, String),
+                ),
+            )
+            .on_conflict_do_nothing(
+                constraint="uq_list_entity_association",
+            )
+            .returning(ListEntityAssociation.entity_id)
+            .cte("changed")
+        )
+    else:
+        changed = (
+            delete(ListEntityAssociation)
+            .where(
+                ListEntityAssociation.list_id == list_id,
+                ListEntityAssociation.entity_type == entity_type,
+                ListEntityAssociation.entity_id.in_(select(requested.c.id)),
+            )
+            .returning(ListEntityAssociation.entity_id)
+            .cte("changed")
+        )
+
+    return select(
+        select(func.count()).select_from(requested).scalar_subquery().label("found"),
+        select(func.count()).select_from(changed).scalar_subquery().label("changed"),
+        select(func.array_agg(requested.c.source_id))
+        .where(requested.c.id.in_(select(changed.c.entity_id)))
+        .scalar_subquery()
+        .label("changed_source_ids"),
+    )
 
 
 @router.post("/lists/{list_id}/modify", response_model=ModifyListResponse)
-def modify_list(
+async def modify_list(
     list_id: int,
     modify_data: ModifyListRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _=Depends(get_current_user),
 ):
-    print("modify_data", modify_data)
     # Fetch the list
-    db_list = db.query(DBList).filter(DBList.id == list_id).first()
+    db_list = await db.get(DBList, list_id)
 
     if not db_list:
         raise HTTPException(status_code=404, detail="List not found.")
@@ -48,95 +133,43 @@ def modify_list(
             status_code=400, detail="Invalid operation. Must be 'add' or 'remove'."
         )
 
-    already_exists = 0
+    list_type = db_list.type
+    if list_type not in LIST_ENTITIES:
+        raise HTTPException(status_code=400, detail="Invalid list type.")
 
-    # Handle company lists
-    if db_list.type == "company":
-        companies = db.query(Company).filter(Company.id.in_(modify_data.item_ids)).all()
-
-        if not companies:
-            raise HTTPException(
-                status_code=404, detail="No companies found with given IDs."
-            )
-
-        if modify_data.operation == "add":
-            # Get existing associations for this list
-            existing_associations = (
-                db.query(ListEntityAssociation)
-                .filter(
-                    ListEntityAssociation.list_id == list_id,
-                    ListEntityAssociation.entity_type == "company",
-                )
-                .all()
-            )
-            existing_company_ids = set(
-                assoc.entity_id for assoc in existing_associations
-            )
-
-            for company in companies:
-                if company.id in existing_company_ids:
-                    already_exists += 1
-                    continue
-                else:
-                    association = ListEntityAssociation(
-                        list_id=list_id,
-                        entity_id=company.id,
-                        entity_type="company",
-                    )
-                    db.add(association)
-        elif modify_data.operation == "remove":
-            db.query(ListEntityAssociation).filter(
-                ListEntityAssociation.list_id == list_id,
-                ListEntityAssociation.entity_id.in_(
-                    [company.id for company in companies]
-                ),
-                ListEntityAssociation.entity_type == "company",
-            ).delete(synchronize_session=False)
-
-    # Handle person lists
-    elif db_list.type == "person":
-        people = db.query(Person).filter(Person.id.in_(modify_data.item_ids)).all()
-
-        if not people:
-            raise HTTPException(
-                status_code=404, detail="No people found with given IDs."
-            )
+    ids = list(dict.fromkeys(modify_data.item_ids))
+    result = (
+        await db.execute(
+            modify_list_statement(list_id, list_type, modify_data.operation, ids)
+        )
+    ).one()
 
-        if modify_data.operation == "add":
-            # Get existing associations for this list
-            existing_associations = (
-                db.query(ListEntityAssociation)
-                .filter(
-                    ListEntityAssociation.list_id == list_id,
-                    ListEntityAssociation.entity_type == "person",
-                )
-                .all()
-            )
-            existing_person_ids = set(
-                assoc.entity_id for assoc in existing_associations
-            )
+    if result.found == 0:
+        await db.rollback()
+        raise HTTPException(
+            status_code=404,
+            detail=(
+                "No companies found with given IDs."
+                if list_type == "company"
+                else "No people found with given IDs."
+            ),
+        )
 
-            for person in people:
-                if person.id in existing_person_ids:
-                    already_exists += 1
-                    continue
-                else:
-                    association = ListEntityAssociation(
-                        list_id=list_id,
-                        entity_id=person.id,
-                        entity_type="person",
-                    )
-                    db.add(association)
-        elif modify_data.operation == "remove":
-            db.query(ListEntityAssociation).filter(
-                ListEntityAssociation.list_id == list_id,
-                ListEntityAssociation.entity_id.in_([person.id for person in people]),
-                ListEntityAssociation.entity_type == "person",
-            ).delete(synchronize_session=False)
+    await db.commit()
 
-    db.commit()
+    if result.changed:
+        _, _, entity_tag, facets_tag = LIST_ENTITIES[list_type]
+        feed_cache.invalidate(
+            list_tag(list_id),
+            facets_tag,
+            *(entity_tag(source_id) for source_id in result.changed_source_ids),
+        )
 
+    adding = modify_data.operation == "add"
     return ModifyListResponse(
         message=f"Successfully {modify_data.operation}ed items to/from the list.",
-        already_exists=already_exists,
+        already_exists=result.found - result.changed if adding else 0,
+        added=result.changed if adding else 0,
+        removed=0 if adding else result.changed,
+        missing=len(ids) - result.found,
     )
@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Depends
+from auth import get_current_user
+from cache import CACHES
+from person_cache import db_stats as person_db_stats
+
+router = APIRouter()
+
+
+@router.get("/metrics/cache")
+def get_cache_stats(
+    _=Depends(get_current_user),
+):
+    stats = {name: cache.stats() for name, cache in CACHES.items()}
+    stats["harmonic_person_db"] = person_db_stats()
+
+    return stats
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends
+from auth import get_current_user
+from database import (
+    ASYNC_POOL_OPTIONS,
+    POOL_PROFILE,
+    SYNC_POOL_OPTIONS,
+    async_engine,
+    engine,
+)
+from db_pool import pool_stats
+
+router = APIRouter()
+
+
+@router.get("/metrics/db_pool")
+def get_db_pool_stats(
+    _=Depends(get_current_user),
+):
+    return {
+        "sync": pool_stats(engine.pool, POOL_PROFILE, SYNC_POOL_OPTIONS),
+        "async": pool_stats(async_engine.pool, POOL_PROFILE, ASYNC_POOL_OPTIONS),
+    }
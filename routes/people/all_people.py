@@ -1,14 +1,25 @@
 import traceback
-from fastapi import Depends, APIRouter, HTTPException, Query, status
-from sqlalchemy import and_, func, or_, select
+from fastapi import Depends, APIRouter, HTTPException, Query, Response, status
+from sqlalchemy import and_, func, null, or_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 from pydantic import BaseModel, HttpUrl
 from datetime import date, datetime
 from auth import get_current_user
-from database import get_db
-from models import ListEntityAssociation, Person, List as DBList, Signal, Source
+from database import get_async_db
+from feed_cache import PEOPLE_FEED, feed_cache, feed_cache_key, list_tag, person_tag
+from json_response import dump_json, json_response
+from total_count import CountMode, count_rows, set_total_count
+from pagination import (
+    NEXT_CURSOR_HEADER,
+    SortKey,
+    keyset_after,
+    keyset_order,
+    set_next_cursor,
+)
+from models import ListEntityAssociation, Person, PersonFeed
 
 router = APIRouter()
 
@@ -90,7 +101,14 @@ class AllPersonResponse(BaseModel):
         from_attributes = True
 
 
-def fetch_people(
+PERSON_SORT_KEYS = [
+    SortKey(PersonFeed.created_at, descending=True),
+    SortKey(PersonFeed.sort_name),
+    SortKey(PersonFeed.person_id, descending=True),
+]
+
+
+def people_query(
     db: Session,
     name: Optional[str] = None,
     skip: int = 0,
@@ -98,123 +116,113 @@ def fetch_people(
     list_id: Optional[int] = None,
     created_at: Optional[date] = None,
     source_name: Optional[str] = None,
-) -> List[Dict]:
-    try:
-        # Subquery to aggregate lists associated with each person
-        list_subquery = (
-            select(
-                ListEntityAssociation.entity_id.label("person_id"),
-                func.json_agg(
-                    func.json_build_object("id", DBList.id, "name", DBList.name)
-                ).label("lists"),
-            )
-            .join(DBList, ListEntityAssociation.list_id == DBList.id)
-            .where(ListEntityAssociation.entity_type == "person")
-            .group_by(ListEntityAssociation.entity_id)
-            .subquery()
+    cursor: Optional[str] = None,
+):
+    """Build the /people page query, also used by tests/test_query_plans.py."""
+    # When filtering by list, added_at comes from the joined association row below
+    added_at = ListEntityAssociation.created_at if list_id is not None else null()
+
+    # person_feed holds one row per source_person_id with the sort keys, source
+    # name and list memberships already joined
+    query = (
+        db.query(
+            PersonFeed.person_id,
+            Person,
+            PersonFeed.lists,
+            PersonFeed.source_name,
+            added_at.label("added_at"),
         )
-
-        people_subquery = (
-            db.query(func.max(Person.id).label("id"))
-            .filter(
-                and_(Person.source_person_id.isnot(None), Person.source_person_id != 0)
+        .join(Person, Person.id == PersonFeed.person_id)
+        .filter(PersonFeed.is_hidden == False)
+        .order_by(*keyset_order(PERSON_SORT_KEYS))
+    )
+
+    # Filter by name if provided
+    if name:
+        query = query.filter(
+            or_(
+                Person.first_name.ilike(f"%{name}%"),
+                Person.last_name.ilike(f"%{name}%"),
             )
-            .filter(or_(Person.is_hidden == False, Person.is_hidden.is_(None)))
-            .group_by(Person.source_person_id)
-            .subquery()
         )
 
-        # Base query to fetch persons and their associated lists
-        query = (
-            db.query(
-                people_subquery.c.id,
-                Person,
-                list_subquery.c.lists,
-                Source.name.label("source_name"),
-            )
-            .join(Person, Person.id == people_subquery.c.id)
-            .outerjoin(Signal, Person.signal_id == Signal.id)
-            .outerjoin(Source, Signal.source_id == Source.id)
-            .outerjoin(list_subquery, Person.id == list_subquery.c.person_id)
-            .order_by(Person.created_at.desc(), Person.first_name.asc())
+    # Filter by source_name if provided
+    if source_name:
+        query = query.filter(PersonFeed.source_name == source_name)
+
+    # If list_id is provided, join and filter by it
+    if list_id is not None:
+        query = query.join(
+            ListEntityAssociation,
+            and_(
+                Person.id == ListEntityAssociation.entity_id,
+                ListEntityAssociation.entity_type == "person",
+            ),
+        ).filter(ListEntityAssociation.list_id == list_id)
+
+    if created_at:
+        query = query.filter(
+            func.date(Person.created_at) == created_at  # Filter by date
         )
 
-        # Filter by name if provided
-        if name:
-            query = query.filter(
-                or_(
-                    Person.first_name.ilike(f"%{name}%"),
-                    Person.last_name.ilike(f"%{name}%"),
-                )
-            )
+    # Apply pagination
+    if cursor:
+        query = query.filter(keyset_after(PERSON_SORT_KEYS, cursor))
+    if skip:
+        query = query.offset(skip)
+    if limit:
+        query = query.limit(limit)
+
+    return query
+
+
+def serialize_person(person, lists, source, added_at) -> Dict:
+    return {
+        "id": person.id,
+        "source_person_id": person.source_person_id,
+        "first_name": person.first_name,
+        "last_name": person.last_name,
+        "source_name": source,
+        "linkedin_headline": person.linkedin_headline,
+        "profile_picture_url": person.profile_picture_url,
+        "location": person.location,
+        "highlights": person.highlights,
+        "education": person.education,
+        "socials": person.socials,
+        "experience": person.experience,
+        "awards": person.awards,
+        "created_at": person.created_at,
+        "comments": person.comments,
+        "relevence_stage": person.relevence_stage,
+        "lists": lists,
+        "added_at": added_at,
+    }
 
-        # Filter by source_name if provided
-        if source_name:
-            query = query.filter(Source.name == source_name)
 
-        # If list_id is provided, join and filter by it
-        if list_id is not None:
-            query = query.join(
-                ListEntityAssociation,
-                and_(
-                    Person.id == ListEntityAssociation.entity_id,
-                    ListEntityAssociation.entity_type == "person",
-                ),
-            ).filter(ListEntityAssociation.list_id == list_id)
-
-        if created_at:
-            query = query.filter(
-                func.date(Person.created_at) == created_at  # Filter by date
-            )
+def fetch_people(
+    db: Session,
+    name: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 10,
+    list_id: Optional[int] = None,
+    created_at: Optional[date] = None,
+    source_name: Optional[str] = None,
+    cursor: Optional[str] = None,
+) -> List[Dict]:
+    try:
+        result = people_query(
+            db, name, skip, limit, list_id, created_at, source_name, cursor
+        ).all()
 
-        # Apply pagination
-        if skip:
-            query = query.offset(skip)
-        if limit:
-            query = query.limit(limit)
-
-        result = query.all()
-
-        serialized_result = []
-        for _, person, lists, source in result:
-            # Initialize the person dictionary with necessary fields
-            person_dict = {
-                "id": person.id,
-                "first_name": person.first_name,
-                "last_name": person.last_name,
-                "source_name": source,
-                "linkedin_headline": person.linkedin_headline,
-                "profile_picture_url": person.profile_picture_url,
-                "location": person.location,
-                "highlights": person.highlights,
-                "education": person.education,
-                "socials": person.socials,
-                "experience": person.experience,
-                "awards": person.awards,
-                "created_at": person.created_at,
-                "comments": person.comments,
-                "relevence_stage": person.relevence_stage,
-                "lists": lists,
-                "added_at": None,  # Default to None
-            }
-
-            # If list_id is provided, fetch added_at
-            if list_id:
-                added_at = (
-                    db.query(ListEntityAssociation.created_at)
-                    .filter(
-                        ListEntityAssociation.entity_id == person.id,
-                        ListEntityAssociation.list_id == list_id,
-                        ListEntityAssociation.entity_type == "person",
-                    )
-                    .scalar()
-                )
-                person_dict["added_at"] = added_at
-
-            serialized_result.append(person_dict)
+        serialized_result = [
+            serialize_person(person, lists, source, added_at)
+            for _, person, lists, source, added_at in result
+        ]
 
         return serialized_result
 
+    except HTTPException as e:
+        raise e
     except SQLAlchemyError as e:
         traceback_str = traceback.format_exc()
         print(f"SQLAlchemyError: {str(e)}\n{traceback_str}")
@@ -231,8 +239,63 @@ def fetch_people(
         )
 
 
+def count_people(
+    db: Session,
+    mode: CountMode,
+    name: Optional[str],
+    list_id: Optional[int],
+    created_at: Optional[date],
+    source_name: Optional[str],
+) -> Tuple[int, str]:
+    query = people_query(
+        db,
+        name,
+        limit=None,
+        list_id=list_id,
+        created_at=created_at,
+        source_name=source_name,
+    ).with_entities(PersonFeed.person_id)
+    filtered = bool(name or created_at or source_name) or list_id is not None
+    return count_rows(db, query, mode, filtered)
+
+
+async def get_people_total(
+    db: AsyncSession,
+    mode: CountMode,
+    name: Optional[str],
+    list_id: Optional[int],
+    created_at: Optional[date],
+    source_name: Optional[str],
+) -> Tuple[int, str]:
+    """Total of the /people filter combination, cached like its pages."""
+    cache_key = feed_cache_key(
+        PEOPLE_FEED,
+        count=mode,
+        name=name,
+        list_id=list_id,
+        created_at=created_at,
+        source_name=source_name,
+    )
+    total = feed_cache.get(cache_key)
+    if total is not None:
+        return total
+
+    cache_version = feed_cache.version
+    total = await db.run_sync(
+        count_people, mode, name, list_id, created_at, source_name
+    )
+
+    # Edits to a person don't change the total, only hiding and list changes do
+    tags = [PEOPLE_FEED]
+    if list_id is not None:
+        tags.append(list_tag(list_id))
+    feed_cache.set(cache_key, total, tags=tags, version=cache_version)
+    return total
+
+
 @router.get("/people", response_model=List[AllPersonResponse])
-def get_or_search_people(
+async def get_or_search_people(
+    response: Response,
     name: Optional[str] = None,
     skip: int = 0,
     limit: int = 50,
@@ -241,11 +304,74 @@ def get_or_search_people(
         None, description="Filter people by creation date"
     ),
     source_name: Optional[str] = None,
+    cursor: Optional[str] = Query(
+        None,
+        description="Opaque cursor from the X-Next-Cursor header of the previous page",
+    ),
+    count: Optional[CountMode] = Query(
+        None,
+        description="Return the total matching people in X-Total-Count: exact, "
+        "or estimated from table statistics when no filter is applied",
+    ),
     _=Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     try:
-        return fetch_people(db, name, skip, limit, list_id, created_at, source_name)
+        if count:
+            set_total_count(
+                response,
+                await get_people_total(
+                    db, count, name, list_id, created_at, source_name
+                ),
+            )
+
+        cache_key = feed_cache_key(
+            PEOPLE_FEED,
+            name=name,
+            skip=skip,
+            limit=limit,
+            list_id=list_id,
+            created_at=created_at,
+            source_name=source_name,
+            cursor=cursor,
+        )
+        # Pages are cached serialized, so a hit costs no validation or encoding
+        cached = feed_cache.get(cache_key)
+        if cached is not None:
+            body, next_cursor = cached
+            if next_cursor:
+                response.headers[NEXT_CURSOR_HEADER] = next_cursor
+            return json_response(body, response.headers)
+
+        cache_version = feed_cache.version
+        people = await db.run_sync(
+            fetch_people, name, skip, limit, list_id, created_at, source_name, cursor
+        )
+        set_next_cursor(
+            response,
+            people,
+            limit,
+            lambda person: (
+                person["created_at"],
+                person["first_name"] or "",
+                person["id"],
+            ),
+        )
+
+        body = dump_json(people, List[AllPersonResponse])
+
+        tags = [PEOPLE_FEED]
+        tags += [person_tag(person["source_person_id"]) for person in people]
+        if list_id is not None:
+            tags.append(list_tag(list_id))
+        feed_cache.set(
+            cache_key,
+            (body, response.headers.get(NEXT_CURSOR_HEADER)),
+            tags=tags,
+            version=cache_version,
+        )
+
+        return json_response(body, response.headers)
     except HTTPException as e:
         raise e
     except Exception as e:
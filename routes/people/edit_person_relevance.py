@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 from pydantic import BaseModel
 from auth import get_current_user
-from database import get_db
+from database import get_async_db
+from feed_cache import PEOPLE_FACETS, feed_cache, person_tag
 from models import Person
 
 router = APIRouter()
@@ -17,35 +19,44 @@ class PersonRelevanceUpdate(BaseModel):
 @router.post("/edit_person_relevence", status_code=status.HTTP_200_OK)
 async def edit_person_relevance(
     person_data: PersonRelevanceUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _=Depends(get_current_user),
 ):
     try:
         # Find the person by ID
-        person = db.query(Person).filter(Person.id == person_data.id).first()
+        person = (
+            await db.execute(
+                select(Person.source_person_id).where(Person.id == person_data.id)
+            )
+        ).first()
 
         if not person:
             raise HTTPException(status_code=404, detail="Person not found")
 
         source_person_id = person.source_person_id
 
-        db.query(Person).filter(Person.source_person_id == source_person_id).update(
-            {Person.relevence_stage: person_data.relevence_stage},
-            synchronize_session=False,
+        await db.execute(
+            update(Person)
+            .where(Person.source_person_id == source_person_id)
+            .values(relevence_stage=person_data.relevence_stage)
+            .execution_options(synchronize_session=False)
         )
-        db.commit()
+        await db.commit()
+        feed_cache.invalidate(person_tag(source_person_id), PEOPLE_FACETS)
 
         return {
             "message": "Relevance stage updated successfully for all related persons"
         }
 
+    except HTTPException as e:
+        raise e
     except SQLAlchemyError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=500,
             detail="An error occurred while updating the relevance stage.",
         )
 
     except Exception:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="An unexpected error occurred.")
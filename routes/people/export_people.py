@@ -0,0 +1,70 @@
+from fastapi import APIRouter, Depends, Query
+from typing import Literal, Optional
+from datetime import date
+from auth import get_current_user
+from config import settings
+from database import SessionLocal
+from export import chunked, export_response, joined
+from routes.people.all_people import AllPersonResponse, people_query, serialize_person
+
+router = APIRouter()
+
+CSV_COLUMNS = {
+    "id": lambda person: person.id,
+    "first_name": lambda person: person.first_name,
+    "last_name": lambda person: person.last_name,
+    "source_name": lambda person: person.source_name,
+    "linkedin_headline": lambda person: person.linkedin_headline,
+    "profile_picture_url": lambda person: person.profile_picture_url,
+    "location": lambda person: person.location.location if person.location else None,
+    "awards": lambda person: joined(person.awards or []),
+    "created_at": lambda person: person.created_at,
+    "comments": lambda person: person.comments,
+    "relevence_stage": lambda person: person.relevence_stage,
+    "lists": lambda person: joined(l.name for l in person.lists or []),
+    "added_at": lambda person: person.added_at,
+}
+
+
+def person_chunks(**filters):
+    # The request session is closed before the body is streamed, so use our own
+    db = SessionLocal()
+    try:
+        rows = people_query(db, skip=0, limit=None, **filters).yield_per(
+            settings.export_chunk_size
+        )
+
+        for chunk in chunked(rows, settings.export_chunk_size):
+            yield [
+                AllPersonResponse.model_validate(
+                    serialize_person(person, lists, source, added_at)
+                )
+                for _, person, lists, source, added_at in chunk
+            ]
+    finally:
+        db.close()
+
+
+@router.get("/people/export")
+def export_people(
+    file_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    name: Optional[str] = None,
+    list_id: Optional[int] = None,
+    created_at: Optional[date] = Query(
+        None, description="Filter people by creation date"
+    ),
+    source_name: Optional[str] = None,
+    _=Depends(get_current_user),
+):
+    """Stream every person matching the /people filters, in feed order."""
+    return export_response(
+        person_chunks(
+            name=name,
+            list_id=list_id,
+            created_at=created_at,
+            source_name=source_name,
+        ),
+        file_format,
+        "people",
+        CSV_COLUMNS,
+    )
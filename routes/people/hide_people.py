@@ -1,12 +1,12 @@
-from fastapi import Depends, APIRouter
-from sqlalchemy.orm import Session
-from pydantic import BaseModel
-from auth import get_current_user
-from database import get_db
-from models import Person
-from fastapi import HTTPException, status
+from fastapi import Depends, APIRouter, HTTPException, status
+from sqlalchemy import ARRAY, Integer, any_, bindparam, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
+from pydantic import BaseModel
 from typing import List
+from auth import get_current_user
+from database import get_async_db
+from feed_cache import PEOPLE_FEED, feed_cache
 from models import Person
 
 router = APIRouter()
@@ -16,40 +16,74 @@ class HidePeopleRequest(BaseModel):
     ids: List[int]
 
 
-@router.post("/peoples/hide", response_model=dict)
-def hide_people(
+class HidePeopleResponse(BaseModel):
+    message: str
+    requested: int
+    found: int
+    hidden: int
+
+
+def hide_people_statement(ids: List[int]):
+    """
+    A single statement hiding the people with `ids` and every person sharing a source
+    person with one of them, selecting how many of `ids` exist and how many people it
+    hid.
+    """
+    # One array parameter, however many ids there are
+    requested = (
+        select(Person.id, Person.source_person_id)
+        .where(Person.id == any_(bindparam("ids", ids, type_=ARRAY(Integer))))
+        .cte("requested")
+    )
+    hidden = (
+        update(Person)
+        .where(
+            or_(
+                Person.id.in_(select(requested.c.id)),
+                Person.source_person_id.in_(select(requested.c.source_person_id)),
+            ),
+            Person.is_hidden.isnot(True),
+        )
+        .values(is_hidden=True)
+        .returning(Person.id)
+        .cte("hidden")
+    )
+
+    return select(
+        select(func.count()).select_from(requested).scalar_subquery().label("found"),
+        select(func.count()).select_from(hidden).scalar_subquery().label("hidden"),
+    )
+
+
+@router.post("/peoples/hide", response_model=HidePeopleResponse)
+async def hide_people(
     request: HidePeopleRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _=Depends(get_current_user),
 ):
     try:
-        people = db.query(Person).filter(Person.id.in_(request.ids)).all()
+        ids = list(dict.fromkeys(request.ids))
+        result = (await db.execute(hide_people_statement(ids))).one()
+        await db.commit()
 
-        if not people:
+        if result.found == 0:
             raise HTTPException(status_code=404, detail="People not found")
 
-        source_person_ids = {
-            person.source_person_id for person in people if person.source_person_id
-        }
-
-        if source_person_ids:
-            people_to_hide = (
-                db.query(Person)
-                .filter(Person.source_person_id.in_(source_person_ids))
-                .all()
-            )
+        if result.hidden:
+            # Hiding shifts every later page of the feed
+            feed_cache.invalidate(PEOPLE_FEED)
 
-            for person in people_to_hide:
-                person.is_hidden = True
-
-        for person in people:
-            person.is_hidden = True
-
-        db.commit()
-
-        return {"message": "People hidden successfully"}
+        return HidePeopleResponse(
+            message="People hidden successfully",
+            requested=len(ids),
+            found=result.found,
+            hidden=result.hidden,
+        )
 
+    except HTTPException:
+        raise
     except SQLAlchemyError as e:
+        await db.rollback()
         print(f"SQLAlchemyError: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
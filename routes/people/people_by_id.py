@@ -1,7 +1,8 @@
-from fastapi import Depends, APIRouter
+from fastapi import Depends, APIRouter, Request, Response
 from sqlalchemy.orm import Session
 from auth import get_current_user
 from database import get_db
+from etag import etag_matches, get_row_version, make_etag, not_modified
 from models import Person
 from fastapi import HTTPException
 
@@ -11,12 +12,24 @@ router = APIRouter()
 @router.get("/peoples/{person_id}")
 def get_person(
     person_id: int,
+    request: Request,
+    response: Response,
     _=Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
+    version = get_row_version(db, Person, person_id)
+
+    if not version:
+        raise HTTPException(status_code=404, detail="Person not found")
+
+    etag = make_etag("person", version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
     person = db.query(Person).where(Person.id == person_id).first()
 
     if not person:
         raise HTTPException(status_code=404, detail="Person not found")
 
+    response.headers["ETag"] = etag
     return person
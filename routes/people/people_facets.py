@@ -0,0 +1,91 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import date
+from auth import get_current_user
+from database import get_async_db
+from facets import FacetsResponse, facets_query, parse_facets
+from feed_cache import PEOPLE_FACETS, PEOPLE_FEED, feed_cache, feed_cache_key
+from json_response import dump_json, json_response
+from models import Person, PersonFeed
+from routes.people.all_people import people_query
+
+router = APIRouter()
+
+
+def people_facets(
+    db: Session,
+    name: Optional[str],
+    list_id: Optional[int],
+    created_at: Optional[date],
+    source_name: Optional[str],
+) -> dict:
+    query = people_query(
+        db,
+        name,
+        limit=None,
+        list_id=list_id,
+        created_at=created_at,
+        source_name=source_name,
+    )
+    rows = facets_query(
+        query,
+        "person",
+        Person.id,
+        PersonFeed.source_person_id,
+        PersonFeed.source_name,
+        Person.created_at,
+        Person.relevence_stage,
+    ).all()
+    return parse_facets(rows)
+
+
+@router.get("/people/facets", response_model=FacetsResponse)
+async def get_people_facets(
+    name: Optional[str] = None,
+    list_id: Optional[int] = None,
+    created_at: Optional[date] = Query(
+        None, description="Filter people by creation date"
+    ),
+    source_name: Optional[str] = None,
+    _=Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    People matching the /people filters per source, creation day, relevance stage
+    and list, with their total, from one grouped query.
+    """
+    try:
+        cache_key = feed_cache_key(
+            PEOPLE_FEED,
+            facets=True,
+            name=name,
+            list_id=list_id,
+            created_at=created_at,
+            source_name=source_name,
+        )
+        body = feed_cache.get(cache_key)
+        if body is None:
+            cache_version = feed_cache.version
+            facets = await db.run_sync(
+                people_facets, name, list_id, created_at, source_name
+            )
+            body = dump_json(facets, FacetsResponse)
+            feed_cache.set(
+                cache_key,
+                body,
+                tags=[PEOPLE_FEED, PEOPLE_FACETS],
+                version=cache_version,
+            )
+
+        return json_response(body)
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        print(f"Error computing people facets: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Unexpected error: {str(e)}",
+        )
@@ -1,7 +1,8 @@
-from fastapi import Depends, APIRouter
+from fastapi import Depends, APIRouter, Query, Response
 from sqlalchemy.orm import Session
 from auth import get_current_user
 from database import get_db
+from pagination import SortKey, keyset_after, keyset_order, set_next_cursor
 from models import Search
 from fastapi import HTTPException, status
 from sqlalchemy.exc import SQLAlchemyError
@@ -24,28 +25,44 @@ class SearchResponse(BaseModel):
     created_at: datetime
 
 
+SEARCH_SORT_KEYS = [
+    SortKey(Search.created_at, descending=True),
+    SortKey(Search.id, descending=True),
+]
+
+
 @router.get("/searches", response_model=List[SearchResponse])
 def get_searches(
+    response: Response,
     skip: int = 0,
     limit: int = 50,
+    cursor: Optional[str] = Query(
+        None,
+        description="Opaque cursor from the X-Next-Cursor header of the previous page",
+    ),
     _=Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     try:
-        searches_query = (
-            db.query(Search)
-            .order_by(Search.created_at.desc())
-            .offset(skip)
-            .limit(limit)
-            .all()
-        )
+        query = db.query(Search).order_by(*keyset_order(SEARCH_SORT_KEYS))
+
+        if cursor:
+            query = query.filter(keyset_after(SEARCH_SORT_KEYS, cursor))
+
+        searches_query = query.offset(skip).limit(limit).all()
 
         searches = []
         for search in searches_query:
             searches.append(search)
 
+        set_next_cursor(
+            response, searches, limit, lambda search: (search.created_at, search.id)
+        )
+
         return searches
 
+    except HTTPException as e:
+        raise e
     except SQLAlchemyError as e:
         print(f"SQLAlchemyError: {e}")
         raise HTTPException(
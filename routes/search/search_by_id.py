@@ -1,7 +1,8 @@
-from fastapi import Depends, APIRouter
+from fastapi import Depends, APIRouter, Request, Response
 from sqlalchemy.orm import Session
 from auth import get_current_user
 from database import get_db
+from etag import etag_matches, get_row_version, make_etag, not_modified
 from models import Search
 from fastapi import HTTPException, status
 from sqlalchemy.exc import SQLAlchemyError
@@ -25,17 +26,31 @@ class SearchResponse(BaseModel):
 @router.get("/searches/{search_id}")
 def get_search(
     search_id: int,
+    request: Request,
+    response: Response,
     _=Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     try:
+        version = get_row_version(db, Search, search_id)
+
+        if not version:
+            raise HTTPException(status_code=404, detail="Search not found")
+
+        etag = make_etag("search", version)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
         search = db.query(Search).where(Search.id == search_id).first()
 
         if not search:
             raise HTTPException(status_code=404, detail="Search not found")
 
+        response.headers["ETag"] = etag
         return search
 
+    except HTTPException as e:
+        raise e
     except SQLAlchemyError as e:
         print(f"SQLAlchemyError: {e}")
         raise HTTPException(
@@ -1,8 +1,10 @@
-from fastapi import Depends, APIRouter, Query
-from sqlalchemy import func, or_
+from fastapi import Depends, APIRouter, Query, Response
+from sqlalchemy import case, cast, func, or_
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Session
 from auth import get_current_user
 from database import get_db
+from pagination import SortKey, keyset_after, keyset_order, set_next_cursor
 from models import Company, Person, Signal
 from fastapi import HTTPException, status
 from sqlalchemy.exc import SQLAlchemyError
@@ -40,19 +42,63 @@ class Document(BaseModel):
     created_at: Optional[datetime] = None
 
 
+# Everything the feed returns but the JSON body of the signal, usually most of its size
+SIGNAL_FEED_COLUMNS = (
+    Signal.id,
+    Signal.name,
+    Signal.source_id,
+    Signal.source_company_ids,
+    Signal.source_people_ids,
+    Signal.ner_tags,
+    Signal.created_at,
+    Signal.updated_at,
+)
+
+
+def source_data_column(include_body: bool):
+    if include_body:
+        return Signal.source_data
+    # Drop the body in Postgres so it is neither sent over the wire nor decoded.
+    # Deleting a key fails on a JSON null or any other non-object, left as it is.
+    source_data = cast(Signal.source_data, JSONB)
+    return case(
+        (
+            func.jsonb_typeof(source_data) == "object",
+            source_data.op("-", return_type=JSONB)("body"),
+        ),
+        else_=source_data,
+    ).label("source_data")
+
+
+SIGNAL_SORT_KEYS = [
+    SortKey(Signal.created_at, descending=True),
+    SortKey(Signal.id, descending=True),
+]
+
+
 @router.get("/signals")
 def get_signals(
+    response: Response,
     skip: int = 0,
     limit: int = 50,
     name: Optional[str] = None,
     created_at: Optional[date] = Query(
         None, description="Filter people by creation date"
     ),
+    cursor: Optional[str] = Query(
+        None,
+        description="Opaque cursor from the X-Next-Cursor header of the previous page",
+    ),
+    include_body: bool = Query(
+        False, description="Include source_data.body, the full text of each signal"
+    ),
     _=Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     try:
-        query = db.query(Signal).order_by(Signal.created_at.desc())
+        query = db.query(
+            *SIGNAL_FEED_COLUMNS, source_data_column(include_body)
+        ).order_by(*keyset_order(SIGNAL_SORT_KEYS))
 
         if name:
             query = query.filter(
@@ -66,15 +112,22 @@ def get_signals(
                 func.date(Signal.created_at) == created_at  # Filter by date
             )
 
+        if cursor:
+            query = query.filter(keyset_after(SIGNAL_SORT_KEYS, cursor))
         if skip:
             query = query.offset(skip)
         if limit:
             query = query.limit(limit)
 
         result = query.all()
+        set_next_cursor(
+            response, result, limit, lambda signal: (signal.created_at, signal.id)
+        )
 
-        return result
+        return [row._asdict() for row in result]
 
+    except HTTPException as e:
+        raise e
     except SQLAlchemyError as e:
         print(f"SQLAlchemyError: {e}")
         raise HTTPException(
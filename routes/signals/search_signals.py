@@ -0,0 +1,100 @@
+from fastapi import Depends, APIRouter, Query, Response
+from sqlalchemy import Float, cast, func
+from sqlalchemy.orm import Session
+from auth import get_current_user
+from database import get_db
+from pagination import SortKey, keyset_after, keyset_order, set_next_cursor
+from models import Signal
+from fastapi import HTTPException, status
+from sqlalchemy.exc import SQLAlchemyError
+from typing import List, Optional
+from pydantic import BaseModel
+from datetime import datetime
+
+router = APIRouter()
+
+HEADLINE_OPTIONS = (
+    "MaxFragments=2, MaxWords=30, MinWords=10, StartSel=<b>, StopSel=</b>"
+)
+
+
+class SignalSearchResult(BaseModel):
+    id: int
+    name: Optional[str] = None
+    source_id: Optional[int] = None
+    created_at: datetime
+    rank: float
+    headline: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+@router.get("/signals/search", response_model=List[SignalSearchResult])
+def search_signals(
+    response: Response,
+    q: str = Query(
+        ...,
+        min_length=1,
+        description='Web search syntax: quoted phrases, "or" and -excluded terms',
+    ),
+    limit: int = Query(20, ge=1, le=100),
+    source_id: Optional[int] = None,
+    cursor: Optional[str] = Query(
+        None,
+        description="Opaque cursor from the X-Next-Cursor header of the previous page",
+    ),
+    _=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    try:
+        ts_query = func.websearch_to_tsquery("english", q)
+        # ts_rank returns real, compare cursors in double precision so they round-trip
+        rank = cast(func.ts_rank(Signal.search_vector, ts_query), Float)
+        sort_keys = [
+            SortKey(rank, descending=True),
+            SortKey(Signal.id, descending=True),
+        ]
+
+        # Rank and page on the GIN index first, highlight only the rows returned
+        page = db.query(Signal.id, rank.label("rank")).filter(
+            Signal.search_vector.op("@@")(ts_query)
+        )
+        if source_id:
+            page = page.filter(Signal.source_id == source_id)
+        if cursor:
+            page = page.filter(keyset_after(sort_keys, cursor))
+        page = page.order_by(*keyset_order(sort_keys)).limit(limit).subquery()
+
+        headline = func.ts_headline(
+            "english",
+            func.coalesce(Signal.source_data["body"].as_string(), Signal.name, ""),
+            ts_query,
+            HEADLINE_OPTIONS,
+        )
+        result = (
+            db.query(
+                Signal.id,
+                Signal.name,
+                Signal.source_id,
+                Signal.created_at,
+                page.c.rank,
+                headline.label("headline"),
+            )
+            .join(page, page.c.id == Signal.id)
+            .order_by(page.c.rank.desc(), Signal.id.desc())
+            .all()
+        )
+
+        set_next_cursor(response, result, limit, lambda row: (row.rank, row.id))
+
+        return result
+
+    except HTTPException as e:
+        raise e
+    except SQLAlchemyError as e:
+        print(f"SQLAlchemyError: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error",
+        )
@@ -1,7 +1,8 @@
-from fastapi import Depends, APIRouter
+from fastapi import Depends, APIRouter, Request, Response
 from sqlalchemy.orm import Session
 from auth import get_current_user
 from database import get_db
+from etag import etag_matches, get_row_version, make_etag, not_modified
 from models import Company, Person, Signal
 from fastapi import HTTPException, status
 from sqlalchemy.exc import SQLAlchemyError
@@ -70,16 +71,31 @@ class ModelItem(BaseModel):
 @router.get("/signals/{signal_id}")
 def get_signal(
     signal_id: int,
+    request: Request,
+    response: Response,
     _=Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     try:
+        version = get_row_version(db, Signal, signal_id)
+
+        if not version:
+            raise HTTPException(status_code=404, detail="Signal not found")
+
+        etag = make_etag("signal", version)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
         signal = db.query(Signal).where(Signal.id == signal_id).first()
 
         if not signal:
             raise HTTPException(status_code=404, detail="Signal not found")
 
+        response.headers["ETag"] = etag
         return signal
+
+    except HTTPException as e:
+        raise e
     except SQLAlchemyError as e:
         print(f"SQLAlchemyError: {e}")
         raise HTTPException(
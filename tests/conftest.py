@@ -0,0 +1,38 @@
+import os
+
+import pytest
+
+# Tests that need Postgres run against the database configured like the app, through
+# the DATABASE_* variables, and are skipped when none is
+DATABASE_CONFIGURED = "DATABASE_HOSTNAME" in os.environ
+
+# config.Settings requires these; placeholders let the modules import without a .env
+for name, value in {
+    "DATABASE_HOSTNAME": "localhost",
+    "DATABASE_PORT": "5432",
+    "DATABASE_PASSWORD": "test",
+    "DATABASE_NAME": "test",
+    "DATABASE_USERNAME": "test",
+    "API_KEY": "test",
+    "HARMONIC_API_KEY": "test",
+}.items():
+    os.environ.setdefault(name, value)
+
+# Re-validate responses built from our own rows, so drift between a response model
+# and the query feeding it fails the tests instead of reaching clients
+os.environ.setdefault("STRICT_RESPONSE_VALIDATION", "true")
+
+
+@pytest.fixture
+def db():
+    if not DATABASE_CONFIGURED:
+        pytest.skip("DATABASE_HOSTNAME is not set")
+
+    from database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
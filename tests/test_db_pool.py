@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from db_pool import (
+    TimedAsyncAdaptedQueuePool,
+    TimedNullPool,
+    TimedQueuePool,
+    pool_options,
+)
+
+SIZES = dict(pool_size=10, max_overflow=5, pool_timeout=10.0, pool_recycle=1800)
+
+
+@pytest.mark.parametrize(
+    "is_async, poolclass", [(False, TimedQueuePool), (True, TimedAsyncAdaptedQueuePool)]
+)
+def test_lambda_keeps_one_warm_connection_per_engine(is_async, poolclass):
+    options = pool_options("lambda", is_async=is_async, **SIZES)
+
+    assert options["poolclass"] is poolclass
+    assert (options["pool_size"], options["max_overflow"]) == (1, 1)
+    assert options["pool_pre_ping"] is True
+    assert options["pool_recycle"] == SIZES["pool_recycle"]
+
+
+@pytest.mark.parametrize("is_async", [False, True])
+def test_lambda_proxy_never_pools(is_async):
+    assert pool_options("lambda_proxy", is_async=is_async, **SIZES) == {
+        "poolclass": TimedNullPool
+    }
+
+
+@pytest.mark.parametrize("is_async", [False, True])
+def test_server_uses_the_configured_sizes(is_async):
+    options = pool_options("server", is_async=is_async, **SIZES)
+
+    assert (options["pool_size"], options["max_overflow"]) == (10, 5)
+
+
+def test_warm_lambda_invocations_reuse_the_async_connection(db):
+    from database import ASYNC_SQLALCHEMY_DATABASE_URL
+
+    engine = create_async_engine(
+        ASYNC_SQLALCHEMY_DATABASE_URL,
+        **pool_options("lambda", is_async=True, **SIZES),
+    )
+
+    async def backend_pid():
+        async with engine.connect() as connection:
+            return await connection.scalar(text("SELECT pg_backend_pid()"))
+
+    # Mangum runs each invocation to completion on the same event loop
+    loop = asyncio.new_event_loop()
+    try:
+        first = loop.run_until_complete(backend_pid())
+        second = loop.run_until_complete(backend_pid())
+        loop.run_until_complete(engine.dispose())
+    finally:
+        loop.close()
+
+    assert first == second
@@ -0,0 +1,187 @@
+from collections import Counter, namedtuple
+from datetime import date
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from facets import (
+    CREATED_AT_SET,
+    LIST_SET,
+    RELEVENCE_STAGE_SET,
+    SOURCE_NAME_SET,
+    TOTAL_SET,
+    facets_query,
+    parse_facets,
+)
+from models import Company, CompanyFeed, List as DBList, ListEntityAssociation, Source
+from routes.company.all_company import companies_query
+from routes.company.company_facets import company_facets
+from routes.people.all_people import people_query
+from routes.people.people_facets import people_facets
+
+FacetRow = namedtuple(
+    "FacetRow",
+    "grouping source_name created_at relevence_stage list_id list_name count",
+)
+
+
+def facet_row(grouping, count, **values):
+    columns = dict.fromkeys(FacetRow._fields)
+    columns.update(values, grouping=grouping, count=count)
+    return FacetRow(**columns)
+
+
+def test_grouping_sets_clear_the_bit_of_their_column():
+    # GROUPING() puts its first argument in the highest bit
+    columns = [SOURCE_NAME_SET, CREATED_AT_SET, RELEVENCE_STAGE_SET, LIST_SET]
+    for position, grouping in enumerate(columns):
+        assert grouping == TOTAL_SET & ~(1 << (len(columns) - 1 - position))
+    assert TOTAL_SET == 0b1111
+
+
+def test_parse_facets_sorts_each_facet():
+    rows = [
+        facet_row(TOTAL_SET, 5),
+        facet_row(SOURCE_NAME_SET, 1, source_name="b"),
+        facet_row(SOURCE_NAME_SET, 3, source_name="a"),
+        facet_row(SOURCE_NAME_SET, 1, source_name=None),
+        facet_row(CREATED_AT_SET, 2, created_at=date(2024, 1, 1)),
+        facet_row(CREATED_AT_SET, 3, created_at=date(2024, 2, 1)),
+        facet_row(RELEVENCE_STAGE_SET, 5, relevence_stage="new"),
+        facet_row(LIST_SET, 2, list_id=2, list_name="b"),
+        facet_row(LIST_SET, 4, list_id=1, list_name="a"),
+        facet_row(LIST_SET, 2, list_id=3, list_name="a"),
+        # Entities in no list
+        facet_row(LIST_SET, 1),
+    ]
+
+    assert parse_facets(rows) == {
+        "total": 5,
+        "source_name": [
+            {"value": "a", "count": 3},
+            {"value": None, "count": 1},
+            {"value": "b", "count": 1},
+        ],
+        "created_at": [
+            {"value": date(2024, 2, 1), "count": 3},
+            {"value": date(2024, 1, 1), "count": 2},
+        ],
+        "relevence_stage": [{"value": "new", "count": 5}],
+        "lists": [
+            {"id": 1, "name": "a", "count": 4},
+            {"id": 3, "name": "a", "count": 2},
+            {"id": 2, "name": "b", "count": 2},
+        ],
+    }
+
+
+def test_parse_facets_without_rows():
+    assert parse_facets([]) == {
+        "total": 0,
+        "source_name": [],
+        "created_at": [],
+        "relevence_stage": [],
+        "lists": [],
+    }
+
+
+def test_facets_query_is_one_grouping_sets_statement():
+    query = facets_query(
+        companies_query(Session(), None, limit=None),
+        "company",
+        Company.id,
+        CompanyFeed.source_company_id,
+        Source.name,
+        Company.created_at,
+        Company.relevence_stage,
+    )
+
+    sql = str(query.statement.compile(dialect=postgresql.dialect()))
+
+    assert "GROUP BY GROUPING SETS((), " in sql
+    assert "grouping(" in sql
+    assert "count(DISTINCT company_feed.source_company_id)" in sql
+    assert "ORDER BY" not in sql
+    assert "LIMIT" not in sql
+
+
+def add_to_new_lists(db, entity_type: str, entity_id: int):
+    """Put the entity in two new lists, so joining its memberships repeats it."""
+    lists = [DBList(name=f"facets test {n}", type=entity_type) for n in range(2)]
+    db.add_all(lists)
+    db.flush()
+    db.add_all(
+        ListEntityAssociation(
+            list_id=db_list.id, entity_id=entity_id, entity_type=entity_type
+        )
+        for db_list in lists
+    )
+    db.flush()
+    return lists
+
+
+def expected_facets(rows, feed_key):
+    """Facet counts of the feed `rows`, counted in Python, one per feed entity."""
+    assert len({feed_key(row) for row in rows}) == len(rows)
+
+    lists = Counter()
+    for row in rows:
+        lists.update({(entry["id"], entry["name"]) for entry in row.lists or []})
+    return {
+        "total": len(rows),
+        "source_name": Counter(row.source_name for row in rows),
+        "lists": lists,
+    }
+
+
+def counted(facets):
+    return {
+        "total": facets["total"],
+        "source_name": Counter(
+            {facet["value"]: facet["count"] for facet in facets["source_name"]}
+        ),
+        "lists": Counter(
+            {(facet["id"], facet["name"]): facet["count"] for facet in facets["lists"]}
+        ),
+    }
+
+
+def test_company_facets_count_each_company_once(db):
+    company = companies_query(db, None, limit=1).first()
+    if company is None:
+        pytest.skip("the database has no visible company")
+    lists = add_to_new_lists(db, "company", company.id)
+    rows = companies_query(db, None, limit=None).all()
+
+    facets = company_facets(db, None, None, None, None, False, 0.3)
+
+    assert counted(facets) == expected_facets(rows, lambda row: row.source_company_id)
+    assert [
+        facet["count"]
+        for facet in facets["lists"]
+        if facet["id"] in {db_list.id for db_list in lists}
+    ] == [1, 1]
+    assert sum(facet["count"] for facet in facets["created_at"]) == len(rows)
+    assert sum(facet["count"] for facet in facets["relevence_stage"]) == len(rows)
+
+
+def test_people_facets_count_each_person_once(db):
+    person = people_query(db, limit=1).first()
+    if person is None:
+        pytest.skip("the database has no visible person")
+    lists = add_to_new_lists(db, "person", person.person_id)
+    rows = people_query(db, limit=None).all()
+
+    facets = people_facets(db, None, None, None, None)
+
+    assert counted(facets) == expected_facets(
+        rows, lambda row: row.Person.source_person_id
+    )
+    assert [
+        facet["count"]
+        for facet in facets["lists"]
+        if facet["id"] in {db_list.id for db_list in lists}
+    ] == [1, 1]
+    assert sum(facet["count"] for facet in facets["created_at"]) == len(rows)
+    assert sum(facet["count"] for facet in facets["relevence_stage"]) == len(rows)
@@ -0,0 +1,197 @@
+import asyncio
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from fastapi import HTTPException
+
+from harmonic import HarmonicClient, gather_with_deadline
+
+
+class StubHarmonicHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so a pooled client can reuse its connection
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append(
+            {
+                "path": self.path,
+                "client_port": self.client_address[1],
+                "apikey": self.headers.get("apikey"),
+                "body": body,
+            }
+        )
+
+        if self.path == "/slow":
+            time.sleep(1)
+        if self.path == "/error":
+            self.respond(500, {"errors": [{"message": "boom"}]})
+        else:
+            self.respond(200, {"data": {"variables": body.get("variables")}})
+
+    def respond(self, status_code: int, content: dict):
+        payload = json.dumps(content).encode()
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHarmonicHandler)
+    server.daemon_threads = True
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def make_client(server, path="/graphql", read_timeout=2.0):
+    host, port = server.server_address
+    return HarmonicClient(
+        url=f"http://{host}:{port}{path}",
+        api_key="stub-key",
+        connect_timeout=1.0,
+        read_timeout=read_timeout,
+        pool_size=2,
+    )
+
+
+def test_execute_returns_the_response_json(stub_server):
+    client = make_client(stub_server)
+
+    result = client.execute("query { ok }", {"ids": [1, 2]})
+
+    assert result == {"data": {"variables": {"ids": [1, 2]}}}
+    request = stub_server.requests[0]
+    assert request["apikey"] == "stub-key"
+    assert request["body"] == {"query": "query { ok }", "variables": {"ids": [1, 2]}}
+
+
+def test_execute_async_runs_the_same_request(stub_server):
+    client = make_client(stub_server)
+
+    result = asyncio.run(client.execute_async("query { ok }", {"id": 3}))
+
+    assert result == {"data": {"variables": {"id": 3}}}
+
+
+def test_requests_reuse_the_pooled_connection(stub_server):
+    client = make_client(stub_server)
+
+    for _ in range(3):
+        client.execute("query { ok }")
+
+    assert len({request["client_port"] for request in stub_server.requests}) == 1
+
+
+def test_read_timeout_maps_to_504(stub_server):
+    client = make_client(stub_server, path="/slow", read_timeout=0.2)
+
+    with pytest.raises(HTTPException) as error:
+        client.execute("query { slow }")
+
+    assert error.value.status_code == 504
+
+
+def test_error_status_maps_to_502(stub_server):
+    client = make_client(stub_server, path="/error")
+
+    with pytest.raises(HTTPException) as error:
+        client.execute("query { error }")
+
+    assert error.value.status_code == 502
+    assert "500" in error.value.detail
+
+
+def test_connection_error_maps_to_502():
+    # A port nothing listens on
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    client = HarmonicClient(
+        url=f"http://127.0.0.1:{port}/graphql",
+        api_key="stub-key",
+        connect_timeout=1.0,
+        read_timeout=1.0,
+        pool_size=1,
+    )
+
+    with pytest.raises(HTTPException) as error:
+        client.execute("query { ok }")
+
+    assert error.value.status_code == 502
+
+
+async def value_after(value, delay: float, started: list):
+    started.append(value)
+    await asyncio.sleep(delay)
+    return value
+
+
+async def fail():
+    raise RuntimeError("boom")
+
+
+def test_gather_with_deadline_returns_results_in_order():
+    started = []
+
+    results = asyncio.run(
+        gather_with_deadline(
+            value_after("slow", 0.05, started),
+            value_after("fast", 0, started),
+            timeout=1,
+        )
+    )
+
+    assert results == ["slow", "fast"]
+
+
+def test_gather_with_deadline_drops_late_and_failed_calls(caplog):
+    started = []
+
+    async def run():
+        late = asyncio.ensure_future(value_after("late", 10, started))
+        results = await gather_with_deadline(
+            value_after("fast", 0, started), late, fail(), timeout=0.05
+        )
+        await asyncio.sleep(0)
+        return results, late
+
+    results, late = asyncio.run(run())
+
+    assert results == ["fast", None, None]
+    assert late.cancelled()
+    assert [record.levelname for record in caplog.records] == ["WARNING", "WARNING"]
+    assert "deadline" in caplog.records[0].getMessage()
+    assert "boom" in caplog.records[1].getMessage()
+
+
+def test_gather_with_deadline_cancels_calls_when_the_caller_is_cancelled():
+    started = []
+
+    async def run():
+        call = asyncio.ensure_future(value_after("slow", 10, started))
+        caller = asyncio.ensure_future(gather_with_deadline(call, timeout=10))
+        while not started:
+            await asyncio.sleep(0)
+        caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+        await asyncio.sleep(0)
+        return call.cancelled()
+
+    assert asyncio.run(run())
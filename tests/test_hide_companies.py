@@ -0,0 +1,24 @@
+from models import Company
+from routes.company.hide_companies import hide_companies_statement
+
+
+def add_company(db, name: str, source_company_id: int) -> Company:
+    company = Company(name=name, source_company_id=source_company_id)
+    db.add(company)
+    db.flush()
+    return company
+
+
+def test_hide_companies_hides_the_source_company_but_not_namesakes(db):
+    source_company_id = -1
+    company = add_company(db, "Hide Test Co", source_company_id)
+    same_source = add_company(db, "Hide Test Co Inc", source_company_id)
+    same_name = add_company(db, "Hide Test Co", source_company_id - 1)
+
+    result = db.execute(hide_companies_statement([company.id])).one()
+    db.expire_all()
+
+    assert (result.found, result.hidden) == (1, 2)
+    assert company.is_hidden is True
+    assert same_source.is_hidden is True
+    assert same_name.is_hidden is False
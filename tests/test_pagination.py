@@ -0,0 +1,59 @@
+import base64
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import Float, cast, func
+
+from models import Signal
+from pagination import SortKey, decode_cursor, encode_cursor
+from routes.company.all_company import COMPANY_SORT_KEYS
+from routes.search.all_search import SEARCH_SORT_KEYS
+
+RANK_SORT_KEYS = [
+    SortKey(cast(func.ts_rank(Signal.search_vector, "q"), Float), descending=True),
+    SortKey(Signal.id, descending=True),
+]
+
+
+@pytest.mark.parametrize(
+    "keys, values",
+    [
+        (COMPANY_SORT_KEYS, [datetime(2024, 1, 1, 12, 30), "Acme", 7]),
+        (SEARCH_SORT_KEYS, [datetime(2024, 1, 1), 3]),
+        (RANK_SORT_KEYS, [0.0607927, 3]),
+        (RANK_SORT_KEYS, [1, 3]),
+    ],
+)
+def test_decode_cursor_round_trips(keys, values):
+    assert decode_cursor(encode_cursor(values), keys) == values
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not base64!",
+        base64.urlsafe_b64encode(b"{not json").decode(),
+        encode_cursor({"a": 1}),
+        encode_cursor(["x", "abc"]),
+        encode_cursor([datetime(2024, 1, 1), "Acme"]),
+        encode_cursor(["x", "abc", 1]),
+        encode_cursor([1, 2, 3]),
+        encode_cursor([datetime(2024, 1, 1), None, 1]),
+        encode_cursor([datetime(2024, 1, 1), "Acme", "7"]),
+        encode_cursor([datetime(2024, 1, 1), "Acme", True]),
+        encode_cursor([datetime(2024, 1, 1), "Acme", 2**40]),
+        encode_cursor([datetime(2024, 1, 1), "Acme", 1.5]),
+        encode_cursor([datetime(2024, 1, 1), "Ac\x00me", 7]),
+        encode_cursor([datetime(2024, 1, 1), ["Acme"], 7]),
+        encode_cursor([datetime(2024, 1, 1, tzinfo=timezone.utc), "Acme", 7]),
+        encode_cursor([{"d": "2024-01-01"}, "Acme", 7]),
+        encode_cursor([{"dt": 5}, "Acme", 7]),
+    ],
+)
+def test_decode_cursor_rejects_malformed_cursors(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, COMPANY_SORT_KEYS)
+
+    assert error.value.status_code == 400
+    assert error.value.detail == "Invalid cursor"
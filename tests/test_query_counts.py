@@ -0,0 +1,108 @@
+"""
+Upper bounds on the SQL statements run per request, so an N+1 query shows up as a
+failure rather than as a slow page. Requests go through the ASGI app in the test's
+own context, where query_counter picks up every statement they run.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+from sqlalchemy import func, select
+
+import harmonic
+from config import settings
+from database import QueryCounter, async_engine, query_counter
+from feed_cache import feed_cache
+from models import CompanyFeed, ListEntityAssociation
+from person_cache import memory_cache
+
+# Statements per request, whatever the page size: the page, plus one lookup of the
+# cached Harmonic profiles of its founders. The detail page also reads the company
+# version for its ETag.
+MAX_QUERIES = {
+    "/companies?limit=50": 2,
+    "/companies?limit=50&list_id={company_list_id}": 2,
+    "/people?limit=50": 1,
+    "/people?limit=50&list_id={person_list_id}": 1,
+    "/companies/{company_id}": 3,
+}
+
+
+class StubHarmonicClient:
+    """Answers every Harmonic query with no data, without a network round trip."""
+
+    def execute(self, query, variables=None):
+        return {
+            "data": {"getPersonsByIds": [], "getCompanyById": {"userConnections": []}}
+        }
+
+    async def execute_async(self, query, variables=None):
+        return self.execute(query, variables)
+
+
+@pytest.fixture
+def paths(db):
+    """MAX_QUERIES paths filled in with a visible company and the fullest lists."""
+
+    def fullest_list(entity_type):
+        return db.scalar(
+            select(ListEntityAssociation.list_id)
+            .filter(ListEntityAssociation.entity_type == entity_type)
+            .group_by(ListEntityAssociation.list_id)
+            .order_by(func.count().desc())
+            .limit(1)
+        )
+
+    ids = {
+        "company_id": db.scalar(
+            select(CompanyFeed.company_id)
+            .filter(CompanyFeed.is_hidden == False)
+            .order_by(CompanyFeed.company_id)
+            .limit(1)
+        ),
+        "company_list_id": fullest_list("company"),
+        "person_list_id": fullest_list("person"),
+    }
+    if None in ids.values():
+        pytest.skip("the database has no visible company or list members")
+
+    return {path: path.format(**ids) for path in MAX_QUERIES}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    from main import app
+
+    monkeypatch.setattr(harmonic, "_client", StubHarmonicClient())
+    feed_cache.clear()
+    memory_cache.clear()
+    return app
+
+
+def count_queries(app, path: str):
+    async def request():
+        counter = QueryCounter()
+        token = query_counter.set(counter)
+        try:
+            async with httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://test"
+            ) as client:
+                response = await client.get(
+                    path, headers={"X-API-Key": settings.api_key}
+                )
+        finally:
+            query_counter.reset(token)
+            # asyncpg connections belong to this event loop, which ends here
+            await async_engine.dispose()
+        return response, counter.count
+
+    return asyncio.run(request())
+
+
+@pytest.mark.parametrize("path", MAX_QUERIES)
+def test_request_runs_a_bounded_number_of_queries(client, paths, path):
+    response, count = count_queries(client, paths[path])
+
+    assert response.status_code == 200, response.text
+    assert count <= MAX_QUERIES[path]
@@ -0,0 +1,109 @@
+"""
+Query plan regression tests for the hot read queries.
+
+EXPLAIN the queries built by the /companies, /people, typeahead and company detail
+endpoints with sequential scans disabled: a Seq Scan that survives that has no index
+to fall back on, however small the test tables are. Run against a database migrated
+with `poetry run alembic upgrade head`.
+"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import inspect
+
+from models import Base
+from pagination import encode_cursor
+from routes.company.all_company import companies_query
+from routes.company.company_by_id import company_data_query
+from routes.company.typeahead_companies import typeahead_query
+from routes.people.all_people import people_query
+
+CURSOR = encode_cursor([datetime(2024, 1, 1), "m", 1])
+
+HOT_QUERIES = {
+    "companies": lambda db: companies_query(db, None, limit=50),
+    "companies by name": lambda db: companies_query(db, "acme", limit=50),
+    "companies in list": lambda db: companies_query(db, None, limit=50, list_id=1),
+    "companies by source": lambda db: companies_query(
+        db, None, limit=50, source_name="x"
+    ),
+    "companies after cursor": lambda db: companies_query(
+        db, None, limit=50, cursor=CURSOR
+    ),
+    "people": lambda db: people_query(db, limit=50),
+    "people by name": lambda db: people_query(db, "jane", limit=50),
+    "people in list": lambda db: people_query(db, limit=50, list_id=1),
+    "people after cursor": lambda db: people_query(db, limit=50, cursor=CURSOR),
+    "company typeahead": lambda db: typeahead_query(db, "ac", 10),
+    "company detail": lambda db: company_data_query(1, db),
+}
+
+# Queries with a single obvious access path, and the index it must use. Pages after
+# a cursor may sort the few rows the planner expects past it instead, so they are
+# only checked for sequential scans.
+EXPECTED_INDEXES = [
+    ("companies", "ix_company_feed_visible_order"),
+    ("people", "ix_person_feed_visible_order"),
+    ("company typeahead", "ix_company_feed_name_prefix"),
+    ("company detail", "company_pkey"),
+]
+
+
+def explain(db, query) -> dict:
+    statement = query.statement.compile(dialect=db.get_bind().dialect)
+    row = (
+        db.connection()
+        .exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", statement.params)
+        .scalar()
+    )
+    return row[0]["Plan"]
+
+
+def plan_nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+@pytest.fixture
+def plan_db(db):
+    db.connection().exec_driver_sql("SET LOCAL enable_seqscan = off")
+    return db
+
+
+@pytest.mark.parametrize("name", HOT_QUERIES)
+def test_hot_query_needs_no_seq_scan(plan_db, name):
+    plan = explain(plan_db, HOT_QUERIES[name](plan_db))
+
+    seq_scans = [
+        node["Relation Name"]
+        for node in plan_nodes(plan)
+        if node["Node Type"] == "Seq Scan"
+    ]
+    assert seq_scans == []
+
+
+@pytest.mark.parametrize("name, index", EXPECTED_INDEXES)
+def test_hot_query_uses_its_index(plan_db, name, index):
+    plan = explain(plan_db, HOT_QUERIES[name](plan_db))
+
+    assert index in {node.get("Index Name") for node in plan_nodes(plan)}
+
+
+def test_models_declare_every_index(db):
+    inspector = inspect(db.get_bind())
+
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        database_indexes = {
+            index["name"] for index in inspector.get_indexes(table.name)
+        }
+        database_indexes -= {
+            constraint["name"]
+            for constraint in inspector.get_unique_constraints(table.name)
+        }
+        declared = {index.name for index in table.indexes}
+
+        assert database_indexes - declared == set(), table.name
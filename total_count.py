@@ -0,0 +1,40 @@
+from typing import Literal, Tuple
+
+from fastapi import Response
+from sqlalchemy.orm import Query, Session
+
+TOTAL_COUNT_HEADER = "X-Total-Count"
+# "exact" or "estimated", the kind of total in X-Total-Count
+TOTAL_COUNT_TYPE_HEADER = "X-Total-Count-Type"
+
+CountMode = Literal["exact", "estimated"]
+
+
+def estimated_rows(db: Session, query: Query) -> int:
+    """The planner's row estimate for `query`, from table statistics."""
+    # Only used for unfiltered feed queries, whose parameters are all constants
+    statement = query.statement.compile(
+        dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True}
+    )
+    plan = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}")
+    return int(plan.scalar()[0]["Plan"]["Plan Rows"])
+
+
+def count_rows(
+    db: Session, query: Query, mode: CountMode, filtered: bool
+) -> Tuple[int, str]:
+    """
+    Total rows of an unpaged feed `query` and whether it is "exact" or "estimated".
+    Estimates only stand in for unfiltered queries; filtered ones are narrow enough
+    to count, and statistics say little about them.
+    """
+    query = query.order_by(None)
+    if mode == "estimated" and not filtered:
+        return estimated_rows(db, query), "estimated"
+    return query.count(), "exact"
+
+
+def set_total_count(response: Response, total: Tuple[int, str]) -> None:
+    count, kind = total
+    response.headers[TOTAL_COUNT_HEADER] = str(count)
+    response.headers[TOTAL_COUNT_TYPE_HEADER] = kind